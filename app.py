@@ -18,7 +18,7 @@ import pandas as pd
 
 try:
     from dependency_container import container
-    from system_initializer import initialize_system, get_system_overview
+    from system_initializer import initialize_system, get_system_overview, probe_legal_system
     from error_handling import format_error_for_display
     CORE_IMPORTS_AVAILABLE = True
 except ImportError as e:
@@ -441,10 +441,9 @@ def _initialize_with_fallback():
         return False
 
 def _handle_initialization_failure():
-    import traceback
     if MARKET_UTILS_AVAILABLE:
         from market_reports.utils import logger
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback for initialization failure", exc_info=True)
     
     st.session_state['system_status'] = 'offline'
     st.session_state['connection_status'] = 'offline'
@@ -488,7 +487,9 @@ def _test_legal_system_enhanced():
     """Enhanced legal system test with Weaviate Cloud detection"""
     try:
         if hasattr(st.session_state['legal_chatbot'], 'get_system_status'):
-            system_status = st.session_state['legal_chatbot'].get_system_status()
+            # Each browser session lands here; the container's chatbot is shared,
+            # so sessions reuse one status probe, re-run at most every 5 seconds
+            system_status = probe_legal_system() or st.session_state['legal_chatbot'].get_system_status()
             if MARKET_UTILS_AVAILABLE:
                 from market_reports.utils import logger
                 logger.info(f"Legal system status: {system_status}")
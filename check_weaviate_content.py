@@ -2,8 +2,42 @@
 # check_weaviate_content.py - Check what's actually in your Weaviate Cloud
 
 import os
+import sys
 import json
+import socket
 from datetime import datetime
+from urllib.parse import urlparse
+
+# Sample-document query, serialized once instead of via the query builder
+_SAMPLE_DOCUMENTS_GQL = """{
+  Get {
+    LegalDocument(limit: 5) {
+      content documentTitle documentType jurisdiction
+    }
+  }
+}"""
+_SAMPLE_DOCUMENT_FORMAT = """
+   Document %d:
+   Title: %s
+   Type: %s
+   Jurisdiction: %s
+   Content: %s...
+"""
+
+# Seconds to wait for a TCP connect before declaring Weaviate unreachable
+_REACHABILITY_TIMEOUT = 2.0
+
+def weaviate_reachable(url, timeout=_REACHABILITY_TIMEOUT) -> bool:
+    """Quick TCP probe of the Weaviate host, so an unreachable server fails fast"""
+    parsed = urlparse(url or "")
+    if not parsed.hostname:
+        return True  # Nothing to probe; let the client report the configuration error
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        socket.create_connection((parsed.hostname, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
 
 def check_weaviate_legal_documents():
     """Check what legal documents are in Weaviate Cloud"""
@@ -11,8 +45,13 @@ def check_weaviate_legal_documents():
     print("=" * 60)
     
     try:
-        # Import the Weaviate client
-        from market_reports.rag_enhanced import get_weaviate_client
+        # Import the Weaviate client (this also loads the .env settings)
+        from market_reports.rag_enhanced import get_weaviate_client, WEAVIATE_URL
+        
+        # Skip the client's connect/retry cycle when the host is down
+        if not weaviate_reachable(WEAVIATE_URL):
+            print("❌ Weaviate Cloud host is not reachable")
+            return False
         
         client = get_weaviate_client()
         if not client:
@@ -65,24 +104,18 @@ def check_weaviate_legal_documents():
         if doc_count > 0:
             print("\n📄 Sample Documents:")
             try:
-                sample_result = client.query.get("LegalDocument", [
-                    "content", "documentTitle", "documentType", "jurisdiction"
-                ]).with_limit(5).do()
+                sample_result = client.query.raw(_SAMPLE_DOCUMENTS_GQL)
                 
                 if sample_result and "data" in sample_result and "Get" in sample_result["data"]:
                     docs = sample_result["data"]["Get"].get("LegalDocument", [])
                     
-                    for i, doc in enumerate(docs, 1):
-                        title = doc.get("documentTitle", "No title")
-                        doc_type = doc.get("documentType", "Unknown")
-                        jurisdiction = doc.get("jurisdiction", "Unknown")
-                        content = doc.get("content", "No content")[:100] + "..."
-                        
-                        print(f"\n   Document {i}:")
-                        print(f"   Title: {title}")
-                        print(f"   Type: {doc_type}")
-                        print(f"   Jurisdiction: {jurisdiction}")
-                        print(f"   Content: {content}")
+                    # One write for all documents instead of five prints each
+                    sys.stdout.write("".join(
+                        _SAMPLE_DOCUMENT_FORMAT % (i, doc.get("documentTitle", "No title"),
+                                                   doc.get("documentType", "Unknown"),
+                                                   doc.get("jurisdiction", "Unknown"),
+                                                   doc.get("content", "No content")[:100])
+                        for i, doc in enumerate(docs, 1)))
                 else:
                     print("   No documents retrieved")
             except Exception as e:
@@ -143,22 +176,20 @@ def check_weaviate_legal_documents():
         traceback.print_exc()
         return False
 
-def test_legal_rag_with_specific_query():
+def test_legal_rag_with_specific_query(legal_rag=None):
     """Test legal RAG with a specific query"""
     print("\n🧪 TESTING LEGAL RAG WITH SPECIFIC QUERY")
     print("=" * 60)
     
     try:
-        from dependency_container import container
-        
-        if not container.has('legal_rag_engine'):
-            print("❌ Legal RAG engine not available")
-            return False
-        
-        legal_rag = container.get('legal_rag_engine')
-        if not legal_rag:
-            print("❌ Legal RAG engine is None")
-            return False
+        if legal_rag is None:
+            # Build the engine directly; the container is never initialized
+            # by this script, so looking it up there always came back empty
+            from legal_compliance.legal_rag_engine import LegalRAGEngine
+            from market_reports.rag_enhanced import get_weaviate_client, openai_client
+            
+            legal_rag = LegalRAGEngine(weaviate_client=get_weaviate_client(),
+                                       openai_client=openai_client)
         
         # Test with different queries
         test_queries = [
@@ -183,13 +214,15 @@ def test_legal_rag_with_specific_query():
                         source = doc.get('source', 'Unknown')
                         print(f"   {i}. {title}... (Source: {source})")
                         
-                        if 'Mock' in source:
+                        if 'Weaviate' in source:
+                            print("      ✅ Real document from Weaviate Cloud")
+                        elif 'Mock' in source:
                             print("      ⚠️ This is mock data")
                         else:
-                            print("      ✅ Real document from Weaviate Cloud")
+                            print("      ⚠️ Offline fallback, not from Weaviate Cloud")
                     
                     # If we found real documents, test response generation
-                    if any('Mock' not in doc.get('source', '') for doc in docs):
+                    if any('Weaviate' in doc.get('source', '') for doc in docs):
                         print(f"\n💬 Testing response generation for '{query}'...")
                         response = legal_rag.generate_legal_response(query)
                         
@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
-# test_basic_search_legal_rag.py - Test the FIXED Legal RAG with Basic Search
+# debug.py - Test the FIXED Legal RAG with Basic Search
 
 import os
 import sys
 from datetime import datetime
 
+_SUMMARY = """
+📋 SUMMARY:
+• Basic search functionality implemented
+• Semantic search disabled (avoids None result issues)
+• Keyword-based relevance scoring added
+• Compatible with your existing Weaviate Cloud documents
+• Uses WHERE clauses for filtering instead of semantic search"""
+
+def _source_note(source: str) -> str:
+    """Where a search result came from; only Weaviate results are real documents"""
+    if 'Weaviate' in source:
+        return "     ✅ Real document from Weaviate Cloud"
+    if 'Mock' in source:
+        return "     ⚠️ This is mock data"
+    return "     ⚠️ Offline fallback, not from Weaviate Cloud"
+
 def test_basic_search_legal_rag():
     """Test the fixed Legal RAG engine with basic search"""
     print("🧪 TESTING FIXED LEGAL RAG ENGINE WITH BASIC SEARCH")
@@ -12,8 +28,7 @@ def test_basic_search_legal_rag():
     
     try:
         # Import the fixed Legal RAG engine
-        sys.path.append('legal_compliance')
-        from legal_rag_engine import LegalRAGEngine
+        from legal_compliance.legal_rag_engine import LegalRAGEngine
         
         # Get Weaviate client
         from market_reports.rag_enhanced import get_weaviate_client
@@ -77,24 +92,18 @@ def test_basic_search_legal_rag():
                 print(f"Found {len(documents)} documents")
                 
                 if documents:
+                    # One write per query instead of five prints per document
+                    lines = []
                     for j, doc in enumerate(documents, 1):
-                        title = doc.get('title', 'No title')[:50]
                         source = doc.get('source', 'Unknown')
-                        relevance = doc.get('relevance_score', 0)
-                        content_preview = doc.get('content', '')[:100]
-                        
-                        print(f"  {j}. {title}...")
-                        print(f"     Source: {source}")
-                        print(f"     Relevance: {relevance:.2f}")
-                        print(f"     Content: {content_preview}...")
-                        
-                        if 'Mock' in source:
-                            print("     ⚠️ This is mock data")
-                        else:
-                            print("     ✅ Real document from Weaviate Cloud")
+                        lines.append("  %d. %s...\n     Source: %s\n     Relevance: %.2f\n     Content: %s...\n%s\n" % (
+                            j, doc.get('title', 'No title')[:50], source, doc.get('relevance_score', 0),
+                            doc.get('content', '')[:100],
+                            _source_note(source)))
+                    sys.stdout.write("".join(lines))
                     
                     # Test response generation for the first successful search with legal content
-                    if any('Mock' not in doc.get('source', '') for doc in documents):
+                    if any('Weaviate' in doc.get('source', '') for doc in documents):
                         print(f"\n💬 Testing Legal Response Generation for '{query}'...")
                         
                         response = legal_rag.generate_legal_response(
@@ -143,8 +152,10 @@ def test_basic_search_legal_rag():
             jurisdictions = legal_rag.get_available_jurisdictions()
             print(f"Jurisdictions ({len(jurisdictions)}): {', '.join(jurisdictions)}")
             
-            practice_areas = legal_rag.get_available_practice_areas()
-            print(f"Practice Areas ({len(practice_areas)}): {', '.join(practice_areas[:5])}...")
+            # Not every engine version exposes practice areas
+            if hasattr(legal_rag, 'get_available_practice_areas'):
+                practice_areas = legal_rag.get_available_practice_areas()
+                print(f"Practice Areas ({len(practice_areas)}): {', '.join(practice_areas[:5])}...")
             
         except Exception as e:
             print(f"❌ Error getting categories/jurisdictions: {e}")
@@ -165,12 +176,7 @@ def test_basic_search_legal_rag():
         print("✅ BASIC SEARCH LEGAL RAG TEST COMPLETE")
         print("=" * 70)
         
-        print("\n📋 SUMMARY:")
-        print("• Basic search functionality implemented")
-        print("• Semantic search disabled (avoids None result issues)")
-        print("• Keyword-based relevance scoring added")
-        print("• Compatible with your existing Weaviate Cloud documents")
-        print("• Uses WHERE clauses for filtering instead of semantic search")
+        print(_SUMMARY)
         
         return True
         
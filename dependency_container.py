@@ -1,11 +1,46 @@
 #!/usr/bin/env python3
 # dependency_container.py - Simple dependency injection container
 
+import time
 import logging
+import threading
+from datetime import datetime
 from typing import Dict, Any, Optional, Callable, Type
 
 logger = logging.getLogger("market_intelligence")
 
+# Marks a singleton whose factory has not run yet (None is a valid result)
+_NOT_CREATED = object()
+
+class MockService:
+    """Marker base class for mock/fallback service implementations"""
+    __slots__ = ()
+
+# Legal compliance services, in reporting order
+_LEGAL_COMPONENTS = ('legal_rag_engine', 'legal_search_engine', 'legal_chatbot')
+
+# Service statuses that make the overall health check 'degraded'
+_DEGRADED_STATUSES = frozenset({'failed', 'degraded'})
+
+def _overall_status(statuses) -> str:
+    """Overall health from the set of per-service statuses"""
+    if 'error' in statuses:
+        return 'critical'
+    if not statuses.isdisjoint(_DEGRADED_STATUSES):
+        return 'degraded'
+    return 'healthy'
+
+# (monotonic second, ISO timestamp) last reported by health_check
+_last_timestamp = (None, "")
+
+def _timestamp() -> str:
+    """Current ISO timestamp, formatted at most once per second"""
+    global _last_timestamp
+    second = int(time.monotonic())
+    if _last_timestamp[0] != second:
+        _last_timestamp = (second, datetime.now().isoformat())
+    return _last_timestamp[1]
+
 class DependencyContainer:
     """Simple dependency injection container to manage system components"""
     
@@ -13,30 +48,33 @@ class DependencyContainer:
         self._services = {}
         self._factories = {}
         self._singletons = {}
+        self._creation_locks = {}
         self._initialized = False
     
     def register(self, name: str, implementation: Any) -> None:
         """Register a service implementation directly"""
-        logger.debug(f"Registering service: {name}")
+        logger.debug("Registering service: %s", name)
         self._services[name] = implementation
     
     def register_factory(self, name: str, factory: Callable[['DependencyContainer'], Any]) -> None:
         """Register a factory function that will create the service when needed"""
-        logger.debug(f"Registering factory: {name}")
+        logger.debug("Registering factory: %s", name)
         self._factories[name] = factory
     
     def register_singleton_factory(self, name: str, factory: Callable[['DependencyContainer'], Any]) -> None:
         """Register a factory that will be called once to create a singleton instance"""
-        logger.debug(f"Registering singleton factory: {name}")
+        logger.debug("Registering singleton factory: %s", name)
         self._factories[name] = factory
         # Mark this as a singleton service
-        self._singletons[name] = None
+        self._singletons[name] = _NOT_CREATED
     
     def get(self, name: str) -> Any:
         """Get a service by name, creating it if needed via factory"""
         # If it's a singleton and we already created it, return the instance
-        if name in self._singletons and self._singletons[name] is not None:
-            return self._singletons[name]
+        # (even if the factory returned None, so a failing factory runs once)
+        instance = self._singletons.get(name, _NOT_CREATED)
+        if instance is not _NOT_CREATED:
+            return instance
         
         # If it's directly registered, return it
         if name in self._services:
@@ -44,19 +82,26 @@ class DependencyContainer:
         
         # If it has a factory, create it
         if name in self._factories:
-            logger.debug(f"Creating service via factory: {name}")
-            service = self._factories[name](self)
-            
-            # If it's a singleton, store the instance
             if name in self._singletons:
-                self._singletons[name] = service
+                return self._create_singleton(name)
             
-            return service
+            logger.debug("Creating service via factory: %s", name)
+            return self._factories[name](self)
         
         # Service not found
-        logger.warning(f"Service not found: {name}")
+        logger.warning("Service not found: %s", name)
         return None
     
+    def _create_singleton(self, name: str) -> Any:
+        """Run a singleton factory at most once, even across threads"""
+        with self._creation_locks.setdefault(name, threading.Lock()):
+            instance = self._singletons.get(name, _NOT_CREATED)
+            if instance is _NOT_CREATED:
+                logger.debug("Creating service via factory: %s", name)
+                instance = self._factories[name](self)
+                self._singletons[name] = instance
+            return instance
+    
     def has(self, name: str) -> bool:
         """Check if a service is registered"""
         return name in self._services or name in self._factories
@@ -71,35 +116,34 @@ class DependencyContainer:
     
     def has_legal_components(self) -> bool:
         """Check if legal compliance components are available"""
-        legal_components = ['legal_rag_engine', 'legal_search_engine', 'legal_chatbot']
-        return all(self.has(comp) for comp in legal_components)
+        return all(self.has(comp) for comp in _LEGAL_COMPONENTS)
     
     def get_legal_system_status(self) -> Dict[str, Any]:
         """Get the status of legal compliance system"""
-        legal_components = ['legal_rag_engine', 'legal_search_engine', 'legal_chatbot']
-        status = {
-            'available': True,
-            'components': {},
-            'missing_components': []
-        }
+        components = []
+        missing = []
+        available = True
         
-        for component in legal_components:
+        for component in _LEGAL_COMPONENTS:
             if self.has(component):
                 service = self.get(component)
                 # Check if it's a mock service
-                is_mock = 'Mock' in service.__class__.__name__ if service else True
-                status['components'][component] = {
+                is_mock = isinstance(service, MockService) if service else True
+                components.append((component, {
                     'available': not is_mock,
                     'type': 'mock' if is_mock else 'real'
-                }
-                if is_mock:
-                    status['available'] = False
+                }))
+                available = available and not is_mock
             else:
-                status['components'][component] = {'available': False, 'type': 'missing'}
-                status['missing_components'].append(component)
-                status['available'] = False
+                components.append((component, {'available': False, 'type': 'missing'}))
+                missing.append(component)
+                available = False
         
-        return status
+        return {
+            'available': available,
+            'components': dict(components),
+            'missing_components': missing
+        }
     
     def get_system_overview(self) -> Dict[str, Any]:
         """Get an overview of all registered services"""
@@ -122,7 +166,7 @@ class DependencyContainer:
         """Clear all cached singleton instances"""
         logger.info("Clearing dependency container cache")
         for name in self._singletons:
-            self._singletons[name] = None
+            self._singletons[name] = _NOT_CREATED
     
     def remove_service(self, name: str) -> bool:
         """Remove a service from the container"""
@@ -141,42 +185,40 @@ class DependencyContainer:
             removed = True
         
         if removed:
-            logger.debug(f"Removed service: {name}")
+            logger.debug("Removed service: %s", name)
         
         return removed
     
     def restart_legal_system(self) -> bool:
         """Restart the legal compliance system components"""
         try:
-            legal_components = ['legal_rag_engine', 'legal_search_engine', 'legal_chatbot']
-            
             # Clear existing legal components
-            for component in legal_components:
+            for component in _LEGAL_COMPONENTS:
                 if component in self._singletons:
-                    self._singletons[component] = None
+                    self._singletons[component] = _NOT_CREATED
             
             # Try to recreate legal components
-            for component in legal_components:
+            for component in _LEGAL_COMPONENTS:
                 if self.has(component):
                     service = self.get(component)
                     if service:
-                        logger.info(f"Restarted legal component: {component}")
+                        logger.info("Restarted legal component: %s", component)
                     else:
-                        logger.warning(f"Failed to restart legal component: {component}")
+                        logger.warning("Failed to restart legal component: %s", component)
                         return False
             
             logger.info("Legal compliance system restarted successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error restarting legal system: {e}")
+            logger.error("Error restarting legal system: %s", e)
             return False
     
     def health_check(self) -> Dict[str, Any]:
         """Perform a health check on all services"""
         health_status = {
             'overall_status': 'healthy',
-            'timestamp': __import__('datetime').datetime.now().isoformat(),
+            'timestamp': _timestamp(),
             'services': {},
             'issues': []
         }
@@ -193,7 +235,7 @@ class DependencyContainer:
                         'error': 'Service returned None'
                     }
                     health_status['issues'].append(f"{service_name}: Service returned None")
-                elif 'Mock' in service.__class__.__name__:
+                elif isinstance(service, MockService):
                     health_status['services'][service_name] = {
                         'status': 'degraded',
                         'type': 'mock_service'
@@ -211,16 +253,26 @@ class DependencyContainer:
                 }
                 health_status['issues'].append(f"{service_name}: {str(e)}")
         
-        # Determine overall status
-        if any(s['status'] == 'error' for s in health_status['services'].values()):
-            health_status['overall_status'] = 'critical'
-        elif any(s['status'] == 'failed' for s in health_status['services'].values()):
-            health_status['overall_status'] = 'degraded'
-        elif any(s['status'] == 'degraded' for s in health_status['services'].values()):
-            health_status['overall_status'] = 'degraded'
+        # Determine overall status from the set of service statuses (one pass)
+        health_status['overall_status'] = _overall_status(
+            {s['status'] for s in health_status['services'].values()})
         
         return health_status
     
+    def get_overall_status(self) -> str:
+        """Overall health only ('healthy', 'degraded' or 'critical'), for liveness checks"""
+        statuses = set()
+        for service_name in set(self._services) | set(self._factories):
+            try:
+                service = self.get(service_name)
+            except Exception:
+                return 'critical'
+            if service is None:
+                statuses.add('failed')
+            elif isinstance(service, MockService):
+                statuses.add('degraded')
+        return _overall_status(statuses)
+    
     def list_all_services(self) -> Dict[str, str]:
         """List all services with their types"""
         services_list = {}
@@ -233,10 +285,14 @@ class DependencyContainer:
         # Factory services
         for name in self._factories:
             if name in self._singletons:
-                if self._singletons[name] is not None:
-                    services_list[name] = f"Singleton: {self._singletons[name].__class__.__name__}"
-                else:
+                instance = self._singletons[name]
+                if instance is _NOT_CREATED:
                     services_list[name] = "Singleton: Not yet created"
+                elif instance is None:
+                    # The factory ran and returned None; that result is memoized
+                    services_list[name] = "Singleton: Failed (factory returned None)"
+                else:
+                    services_list[name] = f"Singleton: {instance.__class__.__name__}"
             else:
                 services_list[name] = "Factory: Creates new instance each time"
         
@@ -263,7 +319,7 @@ class DependencyContainer:
             if service is not None:
                 info['is_instantiated'] = True
                 info['class_name'] = service.__class__.__name__
-                info['type'] = 'mock' if 'Mock' in service.__class__.__name__ else 'real'
+                info['type'] = 'mock' if isinstance(service, MockService) else 'real'
             
         except Exception as e:
             info['error'] = str(e)
@@ -286,9 +342,7 @@ class DependencyContainer:
             'market_report_system', 'pdf_exporter'
         ]
         
-        optional_services = [
-            'legal_rag_engine', 'legal_search_engine', 'legal_chatbot'
-        ]
+        optional_services = _LEGAL_COMPONENTS
         
         # Check critical services
         for service_name in critical_services:
@@ -301,7 +355,7 @@ class DependencyContainer:
                     if service is None:
                         validation_results['failed_services'].append(service_name)
                         validation_results['valid'] = False
-                    elif 'Mock' in service.__class__.__name__:
+                    elif isinstance(service, MockService):
                         validation_results['mock_services'].append(service_name)
                 except Exception as e:
                     validation_results['failed_services'].append(f"{service_name}: {str(e)}")
@@ -313,7 +367,7 @@ class DependencyContainer:
             if self.has(service_name):
                 try:
                     service = self.get(service_name)
-                    if service is not None and 'Mock' not in service.__class__.__name__:
+                    if service is not None and not isinstance(service, MockService):
                         legal_available += 1
                 except Exception:
                     pass
@@ -5,12 +5,24 @@ import os
 import json
 import uuid
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from datetime import datetime
 
 logger = logging.getLogger("legal_compliance")
 os.makedirs("data/legal_conversations", exist_ok=True)
 
+# Read-only: returned as-is by get_legal_categories()/get_available_jurisdictions()
+_LEGAL_CATEGORIES = ("Corporate Law", "Contract Law", "Employment Law", "Commercial Law")
+_JURISDICTIONS = ("Saudi Arabia", "GCC", "International")
+_FALLBACK_CATEGORIES = ("Corporate Law", "Employment Law", "Commercial Law")
+_FALLBACK_JURISDICTIONS = ("Saudi Arabia", "GCC")
+
+# Shared empty history when no session is active (read-only)
+_EMPTY: Tuple = ()
+
+# Constant status fragment, shared between calls (treat as read-only)
+_RAG_UNAVAILABLE = {"status": "unavailable"}
+
 def save_json(filename: str, data: Any) -> bool:
     """Save JSON with error handling"""
     try:
@@ -19,7 +31,7 @@ def save_json(filename: str, data: Any) -> bool:
             json.dump(data, f, ensure_ascii=False, indent=2)
         return True
     except Exception as e:
-        logger.error(f"JSON save error {filename}: {e}")
+        logger.error("JSON save error %s: %s", filename, e)
         return False
 
 def load_json(filename: str) -> Optional[Any]:
@@ -28,7 +40,7 @@ def load_json(filename: str) -> Optional[Any]:
         with open(filename, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        logger.error(f"JSON load error {filename}: {e}")
+        logger.error("JSON load error %s: %s", filename, e)
         return None
 
 # Import Legal RAG Engine
@@ -36,10 +48,12 @@ try:
     from .legal_rag_engine import LegalRAGEngine
     logger.info("Lightweight Legal RAG Engine imported")
 except ImportError as e:
-    logger.warning(f"Legal RAG import failed: {e}")
+    logger.warning("Legal RAG import failed: %s", e)
     
     # Minimal fallback
     class LegalRAGEngine:
+        __slots__ = ("config",)
+        
         def __init__(self, **kwargs):
             self.config = {"max_docs": 3, "model": "gpt-4o-mini"}
         
@@ -52,19 +66,21 @@ except ImportError as e:
             return {"response": f"Lightweight legal guidance for: {query}", 
                    "documents": self.search_legal_documents(query), "citations": []}
         
-        def get_legal_categories(self) -> List[str]:
-            return ["Corporate Law", "Employment Law", "Commercial Law"]
+        def get_legal_categories(self) -> Tuple[str, ...]:
+            return _FALLBACK_CATEGORIES
         
-        def get_available_jurisdictions(self) -> List[str]:
-            return ["Saudi Arabia", "GCC"]
+        def get_available_jurisdictions(self) -> Tuple[str, ...]:
+            return _FALLBACK_JURISDICTIONS
 
 class LegalChatbot:
     """Lightweight Legal Chatbot"""
     
     def __init__(self, legal_rag_engine=None, **kwargs):
         self.legal_rag_engine = legal_rag_engine
+        self._can_test_connection = bool(legal_rag_engine) and hasattr(legal_rag_engine, 'test_connection')
         self.conversations_dir = "data/legal_conversations"
         self.current_session = None
+        self._metadata = None
         self.config = {"max_history": 15, "max_docs": 3, "model": "gpt-4o-mini"}
         logger.info("Lightweight Legal Chatbot initialized")
     
@@ -79,6 +95,7 @@ class LegalChatbot:
             "metadata": {"queries_count": 0, "document_types_consulted": set(), 
                         "jurisdictions_consulted": set(), "lightweight": True}
         }
+        self._metadata = self.current_session["metadata"]
         
         # Add welcome
         self.current_session["messages"].append({
@@ -88,7 +105,7 @@ class LegalChatbot:
             "message_type": "welcome"
         })
         
-        logger.info(f"New lightweight session: {session_id}")
+        logger.info("New lightweight session: %s", session_id)
         return session_id
     
     def ask_legal_question(self, question: str, document_type: str = None, 
@@ -116,13 +133,12 @@ class LegalChatbot:
                 citations, docs_used = [], []
             
             # Update metadata
-            self.current_session["metadata"]["queries_count"] += 1
+            metadata = self._metadata
+            metadata["queries_count"] += 1
             for doc in docs_used:
                 if isinstance(doc, dict):
-                    self.current_session["metadata"]["document_types_consulted"].add(
-                        doc.get("document_type", ""))
-                    self.current_session["metadata"]["jurisdictions_consulted"].add(
-                        doc.get("jurisdiction", ""))
+                    metadata["document_types_consulted"].add(doc.get("document_type", ""))
+                    metadata["jurisdictions_consulted"].add(doc.get("jurisdiction", ""))
             
             # Add assistant response
             self.current_session["messages"].append({
@@ -149,12 +165,12 @@ class LegalChatbot:
             }
             
         except Exception as e:
-            logger.error(f"Question processing error: {e}")
+            logger.error("Question processing error: %s", e)
             return {"response": f"Error: {str(e)}", "success": False, "lightweight": True}
     
-    def get_conversation_history(self) -> List[Dict]:
+    def get_conversation_history(self) -> Sequence[Dict]:
         """Get conversation history"""
-        return self.current_session["messages"] if self.current_session else []
+        return self.current_session["messages"] if self.current_session else _EMPTY
     
     def get_session_summary(self) -> Dict[str, Any]:
         """Get session summary"""
@@ -182,27 +198,28 @@ class LegalChatbot:
         summary = self.get_session_summary()
         session_id = self.current_session["session_id"]
         self.current_session = None
+        self._metadata = None
         
-        logger.info(f"Lightweight session ended: {session_id}")
+        logger.info("Lightweight session ended: %s", session_id)
         return summary
     
-    def get_legal_categories(self) -> List[str]:
+    def get_legal_categories(self) -> Tuple[str, ...]:
         """Get legal categories"""
         if self.legal_rag_engine:
             return self.legal_rag_engine.get_legal_categories()
-        return ["Corporate Law", "Contract Law", "Employment Law", "Commercial Law"]
+        return _LEGAL_CATEGORIES
     
-    def get_available_jurisdictions(self) -> List[str]:
+    def get_available_jurisdictions(self) -> Tuple[str, ...]:
         """Get jurisdictions"""
         if self.legal_rag_engine:
             return self.legal_rag_engine.get_available_jurisdictions()
-        return ["Saudi Arabia", "GCC", "International"]
+        return _JURISDICTIONS
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status"""
-        rag_test = {"status": "unavailable"}
+        rag_test = _RAG_UNAVAILABLE
         
-        if self.legal_rag_engine and hasattr(self.legal_rag_engine, 'test_connection'):
+        if self._can_test_connection:
             try:
                 rag_test = self.legal_rag_engine.test_connection()
             except Exception as e:
@@ -212,7 +229,7 @@ class LegalChatbot:
             "legal_rag_engine": "available" if self.legal_rag_engine else "unavailable",
             "rag_connection_test": rag_test,
             "session_active": self.current_session is not None,
-            "total_queries": self.current_session["metadata"]["queries_count"] if self.current_session else 0,
+            "total_queries": self._metadata["queries_count"] if self._metadata is not None else 0,
             "lightweight_mode": True,
             "config": self.config
         }
@@ -6,7 +6,7 @@ import json
 import time
 import uuid
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime
 
 # Set up logging
@@ -18,6 +18,45 @@ os.makedirs("data", exist_ok=True)
 os.makedirs("data/legal_conversations", exist_ok=True)
 os.makedirs("logs", exist_ok=True)
 
+# Read-only: returned as-is by get_legal_categories()/get_available_jurisdictions()
+_LEGAL_CATEGORIES = (
+    "Corporate Law", 
+    "Contract Law", 
+    "Regulatory Compliance", 
+    "Employment Law", 
+    "Commercial Law",
+    "Banking Law",
+    "Real Estate Law",
+    "Intellectual Property",
+    "Tax Law",
+    "International Trade"
+)
+_JURISDICTIONS = (
+    "Saudi Arabia", 
+    "GCC", 
+    "International",
+    "UAE",
+    "Qatar",
+    "Kuwait",
+    "Bahrain",
+    "Oman"
+)
+
+# Shared empty result for "nothing to list" paths (read-only)
+_EMPTY: Tuple = ()
+
+# Optional legal RAG engine methods the chatbot uses
+_RAG_CAPABILITIES = ("test_connection", "get_legal_categories", "get_available_jurisdictions")
+
+# Constant connection-test results, shared between calls (treat as read-only)
+_BASIC_RAG_TEST = {"status": "basic", "message": "Basic legal RAG available"}
+_NO_RAG_TEST = {"status": "unavailable", "message": "No legal RAG engine"}
+
+_LEGAL_DISCLAIMER = """
+**Legal Disclaimer:** This information is provided for general guidance only and does not constitute legal advice. Laws and regulations may change, and specific circumstances may affect how laws apply to your situation. For specific legal matters, please consult with a qualified attorney licensed to practice in the relevant jurisdiction."""
+# Disclaimer as appended to the first answer of a session
+_DISCLAIMER_SECTION = "\n\n" + _LEGAL_DISCLAIMER
+
 # Utility functions
 def save_json_with_encoding(filename: str, data: Any, indent: int = 2) -> bool:
     """Save JSON data with proper encoding"""
@@ -27,7 +66,7 @@ def save_json_with_encoding(filename: str, data: Any, indent: int = 2) -> bool:
             json.dump(data, f, ensure_ascii=False, indent=indent)
         return True
     except Exception as e:
-        logger.error(f"Error saving JSON {filename}: {e}")
+        logger.error("Error saving JSON %s: %s", filename, e)
         return False
 
 def load_json_with_encoding(filename: str) -> Optional[Any]:
@@ -36,7 +75,7 @@ def load_json_with_encoding(filename: str) -> Optional[Any]:
         with open(filename, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        logger.error(f"Error loading JSON {filename}: {e}")
+        logger.error("Error loading JSON %s: %s", filename, e)
         return None
 
 class LegalChatbot:
@@ -45,8 +84,12 @@ class LegalChatbot:
     def __init__(self, legal_rag_engine=None, web_search_engine=None):
         self.legal_rag_engine = legal_rag_engine
         self.web_search_engine = web_search_engine
+        # Probe the engine's optional methods once instead of per call
+        self._rag_caps = frozenset(name for name in _RAG_CAPABILITIES
+                                   if legal_rag_engine and hasattr(legal_rag_engine, name))
         self.conversations_dir = "data/legal_conversations"
         self.current_session = None
+        self._metadata = None
         self.session_history = []
         
         # Create conversations directory
@@ -73,6 +116,7 @@ class LegalChatbot:
                 "jurisdictions_consulted": set()
             }
         }
+        self._metadata = self.current_session["metadata"]
         
         # Add welcome message
         welcome_message = self._get_welcome_message()
@@ -83,7 +127,7 @@ class LegalChatbot:
             "message_type": "welcome"
         })
         
-        logger.info(f"New legal session started: {session_id}")
+        logger.info("New legal session started: %s", session_id)
         return session_id
     
     def ask_legal_question(self, question: str, document_type: str = None, 
@@ -94,7 +138,7 @@ class LegalChatbot:
                 self.start_new_session()
             
             # Log the question
-            logger.info(f"Legal question in session {self.current_session['session_id']}: {question}")
+            logger.info("Legal question in session %s: %s", self.current_session['session_id'], question)
             
             # Add user message to session
             user_message = {
@@ -127,7 +171,7 @@ class LegalChatbot:
                     citations = rag_response.get("citations", [])
                     documents_used = rag_response.get("documents", [])
                 except Exception as e:
-                    logger.error(f"Error with legal RAG: {e}")
+                    logger.error("Error with legal RAG: %s", e)
                     base_response = f"I can provide general legal guidance on: {question}\n\nThis is a basic response. For full legal analysis, please ensure all dependencies are properly configured."
                     citations = []
                     documents_used = []
@@ -137,6 +181,7 @@ class LegalChatbot:
                 documents_used = []
             
             # Enhance with web search if requested
+            response_parts = [base_response]
             web_sources = []
             if (include_web_search or self.enable_web_enhancement) and self.web_search_engine:
                 try:
@@ -150,21 +195,21 @@ class LegalChatbot:
                     if "data" in web_results and web_results["data"]:
                         web_sources = web_results["data"]
                         
-                        # Add web information to response
-                        web_content = "\n\n**Latest Legal Developments:**\n"
-                        for source in web_sources[:1]:  # Limit to 1 web source for legal accuracy
-                            web_content += f"• Recent Update: {source.get('title', 'Legal Update')}\n"
-                            web_content += f"  Source: {source.get('url', 'Unknown')}\n"
-                        
-                        base_response += web_content
+                        # Add web information to response (1 web source, for legal accuracy)
+                        source = web_sources[0]
+                        response_parts.append(
+                            "\n\n**Latest Legal Developments:**\n"
+                            f"• Recent Update: {source.get('title', 'Legal Update')}\n"
+                            f"  Source: {source.get('url', 'Unknown')}\n")
                 
                 except Exception as e:
-                    logger.warning(f"Web search enhancement failed: {e}")
+                    logger.warning("Web search enhancement failed: %s", e)
             
             # Add legal disclaimer
             if not self.disclaimer_shown:
-                base_response += "\n\n" + self._get_legal_disclaimer()
+                response_parts.append(_DISCLAIMER_SECTION)
                 self.disclaimer_shown = True
+            base_response = "".join(response_parts)
             
             # FIXED: Safely extract document metadata
             document_types = []
@@ -202,18 +247,19 @@ class LegalChatbot:
             self.current_session["messages"].append(assistant_response)
             
             # FIXED: Update session metadata safely
-            self.current_session["metadata"]["queries_count"] += 1
+            metadata = self._metadata
+            metadata["queries_count"] += 1
             
             # FIXED: Safely update sets - ensure they are sets, not lists
-            if not isinstance(self.current_session["metadata"]["document_types_consulted"], set):
-                self.current_session["metadata"]["document_types_consulted"] = set()
+            if not isinstance(metadata["document_types_consulted"], set):
+                metadata["document_types_consulted"] = set()
             
-            if not isinstance(self.current_session["metadata"]["jurisdictions_consulted"], set):
-                self.current_session["metadata"]["jurisdictions_consulted"] = set()
+            if not isinstance(metadata["jurisdictions_consulted"], set):
+                metadata["jurisdictions_consulted"] = set()
             
             # Update with new values
-            self.current_session["metadata"]["document_types_consulted"].update(document_types)
-            self.current_session["metadata"]["jurisdictions_consulted"].update(jurisdictions)
+            metadata["document_types_consulted"].update(document_types)
+            metadata["jurisdictions_consulted"].update(jurisdictions)
             
             # Keep session history manageable
             if len(self.current_session["messages"]) > self.max_history_length:
@@ -236,9 +282,8 @@ class LegalChatbot:
             }
             
         except Exception as e:
-            logger.error(f"Error processing legal question: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.error("Error processing legal question: %s", e)
+            logger.debug("Traceback for legal question failure", exc_info=True)
             
             error_response = {
                 "response": f"I encountered an error while processing your legal question: {str(e)}. Please try again or contact support.",
@@ -258,10 +303,10 @@ class LegalChatbot:
             
             return error_response
     
-    def get_conversation_history(self) -> List[Dict]:
+    def get_conversation_history(self) -> Sequence[Dict]:
         """Get the current session's conversation history"""
         if not self.current_session:
-            return []
+            return _EMPTY
         return self.current_session["messages"]
     
     def get_session_summary(self) -> Dict[str, Any]:
@@ -297,17 +342,19 @@ class LegalChatbot:
         # Clear current session
         session_id = self.current_session["session_id"]
         self.current_session = None
+        self._metadata = None
         self.disclaimer_shown = False
         
-        logger.info(f"Legal session ended: {session_id}")
+        logger.info("Legal session ended: %s", session_id)
         return summary
     
-    def list_previous_sessions(self, user_id: str = None) -> List[Dict]:
+    def list_previous_sessions(self, user_id: str = None) -> Sequence[Dict]:
         """List previous legal consultation sessions"""
         try:
-            sessions = []
             if not os.path.exists(self.conversations_dir):
-                return sessions
+                return _EMPTY
+            
+            sessions = []
                 
             for filename in os.listdir(self.conversations_dir):
                 if filename.startswith("legal_session_") and filename.endswith(".json"):
@@ -329,7 +376,7 @@ class LegalChatbot:
                                 "user_id": session_data.get("user_id", "anonymous")
                             })
                     except Exception as e:
-                        logger.warning(f"Error reading session file {filename}: {e}")
+                        logger.warning("Error reading session file %s: %s", filename, e)
                         continue
             
             # Sort by start time (newest first)
@@ -337,48 +384,28 @@ class LegalChatbot:
             return sessions
             
         except Exception as e:
-            logger.error(f"Error listing sessions: {e}")
-            return []
+            logger.error("Error listing sessions: %s", e)
+            return _EMPTY
     
-    def get_legal_categories(self) -> List[str]:
+    def get_legal_categories(self) -> Tuple[str, ...]:
         """Get available legal categories"""
-        if self.legal_rag_engine and hasattr(self.legal_rag_engine, 'get_legal_categories'):
+        if 'get_legal_categories' in self._rag_caps:
             try:
                 return self.legal_rag_engine.get_legal_categories()
             except Exception as e:
-                logger.warning(f"Error getting categories from RAG engine: {e}")
+                logger.warning("Error getting categories from RAG engine: %s", e)
         
-        return [
-            "Corporate Law", 
-            "Contract Law", 
-            "Regulatory Compliance", 
-            "Employment Law", 
-            "Commercial Law",
-            "Banking Law",
-            "Real Estate Law",
-            "Intellectual Property",
-            "Tax Law",
-            "International Trade"
-        ]
+        return _LEGAL_CATEGORIES
     
-    def get_available_jurisdictions(self) -> List[str]:
+    def get_available_jurisdictions(self) -> Tuple[str, ...]:
         """Get available jurisdictions"""
-        if self.legal_rag_engine and hasattr(self.legal_rag_engine, 'get_available_jurisdictions'):
+        if 'get_available_jurisdictions' in self._rag_caps:
             try:
                 return self.legal_rag_engine.get_available_jurisdictions()
             except Exception as e:
-                logger.warning(f"Error getting jurisdictions from RAG engine: {e}")
+                logger.warning("Error getting jurisdictions from RAG engine: %s", e)
         
-        return [
-            "Saudi Arabia", 
-            "GCC", 
-            "International",
-            "UAE",
-            "Qatar",
-            "Kuwait",
-            "Bahrain",
-            "Oman"
-        ]
+        return _JURISDICTIONS
     
     def export_session_report(self, session_id: str = None) -> Dict[str, Any]:
         """Export a detailed session report"""
@@ -431,7 +458,7 @@ class LegalChatbot:
             return report
             
         except Exception as e:
-            logger.error(f"Error exporting session report: {e}")
+            logger.error("Error exporting session report: %s", e)
             return {"error": f"Failed to export report: {str(e)}"}
     
     def load_session(self, session_id: str) -> bool:
@@ -460,13 +487,14 @@ class LegalChatbot:
                 
                 session_data["metadata"] = metadata
                 self.current_session = session_data
-                logger.info(f"Loaded legal session: {session_id}")
+                self._metadata = metadata
+                logger.info("Loaded legal session: %s", session_id)
                 return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Error loading session {session_id}: {e}")
+            logger.error("Error loading session %s: %s", session_id, e)
             return False
     
     def _save_current_session(self) -> bool:
@@ -500,7 +528,7 @@ class LegalChatbot:
             return save_json_with_encoding(filename, session_copy)
             
         except Exception as e:
-            logger.error(f"Error saving session: {e}")
+            logger.error("Error saving session: %s", e)
             return False
     
     def _get_welcome_message(self) -> str:
@@ -522,8 +550,7 @@ How can I assist you with your legal question today?"""
     
     def _get_legal_disclaimer(self) -> str:
         """Get the legal disclaimer text"""
-        return """
-**Legal Disclaimer:** This information is provided for general guidance only and does not constitute legal advice. Laws and regulations may change, and specific circumstances may affect how laws apply to your situation. For specific legal matters, please consult with a qualified attorney licensed to practice in the relevant jurisdiction."""
+        return _LEGAL_DISCLAIMER
     
     def _calculate_session_duration(self) -> float:
         """Calculate session duration in minutes"""
@@ -542,22 +569,22 @@ How can I assist you with your legal question today?"""
         
         # Test RAG engine if available
         rag_test = None
-        if self.legal_rag_engine and hasattr(self.legal_rag_engine, 'test_connection'):
+        if 'test_connection' in self._rag_caps:
             try:
                 rag_test = self.legal_rag_engine.test_connection()
             except Exception as e:
                 rag_test = {"status": "error", "message": str(e)}
         elif self.legal_rag_engine:
-            rag_test = {"status": "basic", "message": "Basic legal RAG available"}
+            rag_test = _BASIC_RAG_TEST
         else:
-            rag_test = {"status": "unavailable", "message": "No legal RAG engine"}
+            rag_test = _NO_RAG_TEST
         
         return {
             "legal_rag_engine": rag_status,
             "legal_search_engine": search_status,
             "rag_connection_test": rag_test,
             "session_active": self.current_session is not None,
-            "total_queries": self.current_session["metadata"]["queries_count"] if self.current_session else 0
+            "total_queries": self._metadata["queries_count"] if self._metadata is not None else 0
         }
     
     def test_legal_system(self):
@@ -2,20 +2,164 @@
 # legal_compliance/legal_rag_engine.py - Lightweight Cost-Optimized Legal RAG
 
 import os
+import re
+import sys
+import glob
+import json
+import time
+import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
 logger = logging.getLogger("legal_compliance")
 
+# Static parts of the analysis prompt; only the query and context vary per call
+_PROMPT_PREFIX = sys.intern("Based on these legal documents, provide concise legal analysis for: ")
+_PROMPT_SUFFIX = sys.intern("""
+
+Structure:
+**Legal Framework:** [Key laws/regulations]
+**Requirements:** [Main obligations]  
+**Compliance:** [Required steps]
+**Recommendations:** [Practical guidance]
+
+**Disclaimer:** General information only. Consult qualified attorney for specific advice.""")
+# Read-only: returned as-is by get_legal_categories()/get_available_jurisdictions()
+_LEGAL_CATEGORIES = ("Corporate Law", "Contract Law", "Employment Law", "Commercial Law", 
+                     "Banking Law", "Real Estate Law", "Tax Law", "Regulatory Compliance")
+_JURISDICTIONS = ("Saudi Arabia", "GCC", "International", "UAE", "Qatar", "Kuwait")
+
+# Constant connection-test result, shared between calls (treat as read-only)
+_NO_CLIENT_TEST = {"status": "error", "message": "No Weaviate client"}
+
+# Seconds a Weaviate connection-test result is reused before re-probing
+_CONNECTION_TEST_TTL = 30
+
+# Weaviate search results kept per engine (LRU)
+_SEARCH_CACHE_SIZE = 512
+
+# LegalDocument properties read by search_legal_documents (treat as read-only)
+_SEARCH_PROPERTIES = ["content", "documentTitle", "documentType", "jurisdiction", "practiceArea"]
+
+# (Weaviate property, result key, default) copied as-is into search results
+_RESULT_FIELDS = (("documentType", "document_type", "Unknown"),
+                  ("jurisdiction", "jurisdiction", "Unknown"),
+                  ("practiceArea", "practice_area", "General"))
+
+# Query terms turned into content Like operands for the Weaviate where-clause
+_KEYWORD_FILTER_TERMS = 2
+
+# Processed documents (see LegalDocumentProcessor) indexed for offline search
+_PROCESSED_LEGAL_DIR = "data/processed_legal"
+_FALLBACK_CHUNK_CHARS = 600
+_FTS_TOKEN = re.compile(r"\w{3,}")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+def _chunk_text(text: str) -> List[str]:
+    """Split text into chunks of about _FALLBACK_CHUNK_CHARS on word/paragraph boundaries"""
+    chunks, words, size = [], [], 0
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        for word in paragraph.split():
+            if words and size + len(word) > _FALLBACK_CHUNK_CHARS:
+                chunks.append(" ".join(words))
+                words, size = [], 0
+            words.append(word)
+            size += len(word) + 1
+        # Prefer ending a chunk at a paragraph break once it is half full
+        if size >= _FALLBACK_CHUNK_CHARS // 2:
+            chunks.append(" ".join(words))
+            words, size = [], 0
+    if words:
+        chunks.append(" ".join(words))
+    return chunks
+
+_NO_DOCUMENTS_RESPONSE = "No relevant legal documents found. Consult a qualified attorney."
+# Appended when an OpenAI stream breaks off after part of the answer was sent
+_STREAM_INTERRUPTED = "\n\n*[Response interrupted - the answer above is incomplete. Please try again.]*"
+_FALLBACK_DISCLAIMER = "\n**Legal Disclaimer:** General information only. Consult qualified attorney for specific advice."
+
+_SYSTEM_MESSAGE = {"role": "system", "content": "You are a legal analyst. Provide concise, accurate analysis based on provided documents."}
+
+class _FallbackIndex:
+    """In-memory SQLite FTS5 index over processed legal documents on disk"""
+    
+    def __init__(self, directory: str = _PROCESSED_LEGAL_DIR):
+        self.directory = directory
+        self._conn = None
+        self._failed = False  # build failed (e.g. no FTS5); don't retry every search
+        self._lock = threading.Lock()
+    
+    def _build(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("CREATE VIRTUAL TABLE chunks USING fts5("
+                     "text, title UNINDEXED, document_type UNINDEXED, "
+                     "jurisdiction UNINDEXED, practice_area UNINDEXED)")
+        rows = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    doc = json.load(f)
+                text = doc["content"]["cleaned_text"]
+            except Exception as e:
+                logger.debug("Skipping %s for fallback index: %s", path, e)
+                continue
+            analysis = doc.get("legal_analysis") or {}
+            categories = analysis.get("legal_categories") or ["General"]
+            meta = (str(doc.get("file_name", "Legal Document"))[:100],
+                    str(analysis.get("document_type", "Unknown")),
+                    str(analysis.get("jurisdiction", "Unknown")),
+                    str(categories[0]))
+            rows.extend((chunk,) + meta for chunk in _chunk_text(text))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?)", rows)
+        logger.info("Fallback legal index built: %d chunks", len(rows))
+        return conn
+    
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """BM25-ranked chunks matching any query term"""
+        terms = _FTS_TOKEN.findall(query.lower())
+        if not terms:
+            return []
+        with self._lock:
+            if self._conn is None:
+                if self._failed:
+                    return []
+                try:
+                    self._conn = self._build()
+                except Exception as e:
+                    self._failed = True
+                    logger.warning("Fallback legal index unavailable: %s", e)
+                    return []
+            rows = self._conn.execute(
+                "SELECT text, title, document_type, jurisdiction, practice_area, bm25(chunks) "
+                "FROM chunks WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+                (" OR ".join('"%s"' % t for t in terms), limit)).fetchall()
+        # bm25() is negative, lower is better
+        return [{"content": text, "title": title, "document_type": doc_type,
+                 "jurisdiction": jurisdiction, "practice_area": area,
+                 "relevance_score": -score,
+                 "source": "Local Legal Index (Offline)", "offline": True}
+                for text, title, doc_type, jurisdiction, area, score in rows]
+
+
+# Shared across engines; built on first fallback search
+_fallback_index = _FallbackIndex()
+
 class LegalRAGEngine:
     """Lightweight Legal RAG with GPT-4o-mini and 3-document context"""
     
     def __init__(self, weaviate_client=None, openai_client=None, **kwargs):
         self.weaviate_client = weaviate_client
         self.openai_client = openai_client or self._init_openai()
+        # v1+ clients expose .chat; older ones use ChatCompletion
+        self._openai_v1 = hasattr(self.openai_client, 'chat')
         self.legal_class = "LegalDocument"
         self.query_history = []
+        self._connection_test = (0.0, None)  # (monotonic time, result)
+        self._search_cache = OrderedDict()
+        self._search_lock = threading.Lock()  # engine is shared across sessions
         
         # Lightweight config
         self.config = {
@@ -36,7 +180,7 @@ class LegalRAGEngine:
             if api_key:
                 return openai.OpenAI(api_key=api_key) if hasattr(openai, 'OpenAI') else openai
         except Exception as e:
-            logger.warning(f"OpenAI init failed: {e}")
+            logger.warning("OpenAI init failed: %s", e)
         return None
     
     def search_legal_documents(self, query: str, limit: int = None, **filters) -> List[Dict]:
@@ -47,21 +191,26 @@ class LegalRAGEngine:
             return self._mock_documents(query, limit)
         
         try:
+            # Repeated questions in a chat are common; serve them without a round-trip
+            cache_key = self._search_cache_key(query, limit, filters)
+            if cache_key is not None:
+                with self._search_lock:
+                    cached = self._search_cache.get(cache_key)
+                    if cached is not None:
+                        self._search_cache.move_to_end(cache_key)
+                        return list(cached)
+            
             # Basic search query
             builder = (self.weaviate_client.query
-                      .get(self.legal_class, ["content", "documentTitle", "documentType", 
-                                             "jurisdiction", "practiceArea"])
+                      .get(self.legal_class, _SEARCH_PROPERTIES)
                       .with_limit(limit * 2))  # Get extra for filtering
             
             # Add keyword filters
-            terms = [term for term in query.lower().split() if len(term) > 3][:2]
-            if terms:
-                conditions = [{"path": "content", "operator": "Like", "valueText": f"*{term}*"} 
-                             for term in terms]
-                if len(conditions) == 1:
-                    builder = builder.with_where(conditions[0])
-                else:
-                    builder = builder.with_where({"operator": "Or", "operands": conditions})
+            conditions = [{"path": "content", "operator": "Like", "valueText": f"*{term}*"}
+                          for term in [t for t in query.lower().split() if len(t) > 3][:_KEYWORD_FILTER_TERMS]]
+            if conditions:
+                builder = builder.with_where(conditions[0] if len(conditions) == 1
+                                             else {"operator": "Or", "operands": conditions})
             
             result = builder.do()
             
@@ -71,35 +220,53 @@ class LegalRAGEngine:
             
             docs = result["data"]["Get"].get(self.legal_class, [])
             processed = []
+            terms = set(query.lower().split())
+            max_content = self.config["max_content"]
             
             for doc in docs:
                 if not isinstance(doc, dict):
                     continue
                 
+                relevance = self._calc_relevance(terms, doc)
+                if relevance < 1.0:  # Only relevant docs
+                    continue
+                
                 content = str(doc.get("content", ""))
-                if len(content) > self.config["max_content"]:
+                if len(content) > max_content:
                     content = self._smart_truncate(content)
                 
-                relevance = self._calc_relevance(query, doc)
-                if relevance >= 1.0:  # Only relevant docs
-                    processed.append({
-                        "content": content,
-                        "title": str(doc.get("documentTitle", "Legal Document"))[:100],
-                        "document_type": str(doc.get("documentType", "Unknown")),
-                        "jurisdiction": str(doc.get("jurisdiction", "Unknown")),
-                        "practice_area": str(doc.get("practiceArea", "General")),
-                        "relevance_score": relevance,
-                        "source": "Weaviate Cloud (Lightweight)"
-                    })
+                item = {out: str(doc.get(key, default)) for key, out, default in _RESULT_FIELDS}
+                item["content"] = content
+                item["title"] = str(doc.get("documentTitle", "Legal Document"))[:100]
+                item["relevance_score"] = relevance
+                item["source"] = "Weaviate Cloud (Lightweight)"
+                processed.append(item)
             
             # Sort by relevance and return top results
             processed.sort(key=lambda x: x["relevance_score"], reverse=True)
-            return processed[:limit]
+            results = processed[:limit]
+            
+            if cache_key is not None:
+                with self._search_lock:
+                    self._search_cache[cache_key] = results
+                    if len(self._search_cache) > _SEARCH_CACHE_SIZE:
+                        self._search_cache.popitem(last=False)
+            return list(results)
             
         except Exception as e:
-            logger.error(f"Search error: {e}")
+            logger.error("Search error: %s", e)
             return self._mock_documents(query, limit)
     
+    @staticmethod
+    def _search_cache_key(query: str, limit: int, filters: Dict) -> Optional[Tuple]:
+        """Search cache key, or None when a filter value is unhashable (e.g. a list)"""
+        key = (query.lower().strip(), limit, tuple(sorted(filters.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
     def generate_legal_response(self, query: str, **kwargs) -> Dict[str, Any]:
         """Generate lightweight legal response"""
         try:
@@ -109,8 +276,7 @@ class LegalRAGEngine:
             # Get documents
             docs = self.search_legal_documents(query, **kwargs)
             if not docs:
-                return {"response": "No relevant legal documents found. Consult a qualified attorney.", 
-                       "documents": [], "citations": []}
+                return {"response": _NO_DOCUMENTS_RESPONSE, "documents": [], "citations": []}
             
             # Create context
             context = self._format_context(docs)
@@ -130,10 +296,24 @@ class LegalRAGEngine:
             }
             
         except Exception as e:
-            logger.error(f"Response generation error: {e}")
+            logger.error("Response generation error: %s", e)
             return {"response": f"Error processing legal question: {str(e)}", 
                    "documents": [], "citations": [], "error": str(e)}
     
+    def stream_legal_response(self, query: str, **kwargs) -> Iterator[str]:
+        """Yield the legal response text in chunks as it is produced"""
+        self.query_history.append({"query": query, "timestamp": datetime.now().isoformat()})
+        
+        docs = self.search_legal_documents(query, **kwargs)
+        if not docs:
+            yield _NO_DOCUMENTS_RESPONSE
+        elif not self.openai_client:
+            yield from self._fallback_sections(query, docs)
+        elif self._openai_v1:
+            yield from self._stream_response(query, docs)
+        else:
+            yield self._generate_response(query, self._format_context(docs))
+    
     def _smart_truncate(self, text: str) -> str:
         """Smart content truncation"""
         if len(text) <= self.config["max_content"]:
@@ -147,9 +327,8 @@ class LegalRAGEngine:
         
         return truncated[:truncated.rfind(' ')] + "..." if ' ' in truncated else truncated + "..."
     
-    def _calc_relevance(self, query: str, doc: Dict) -> float:
-        """Calculate document relevance"""
-        terms = set(query.lower().split())
+    def _calc_relevance(self, terms: set, doc: Dict) -> float:
+        """Calculate document relevance for a set of lower-cased query terms"""
         content = doc.get("content", "").lower()
         title = doc.get("documentTitle", "").lower()
         
@@ -158,35 +337,20 @@ class LegalRAGEngine:
     
     def _format_context(self, docs: List[Dict]) -> str:
         """Format documents for AI context"""
-        context = "=== LEGAL DOCUMENTS ===\n\n"
+        parts = ["=== LEGAL DOCUMENTS ===\n\n"]
         for i, doc in enumerate(docs, 1):
-            context += f"--- Document {i} ---\n"
-            context += f"Title: {doc['title']}\n"
-            context += f"Type: {doc['document_type']}\n"
-            context += f"Content: {doc['content']}\n\n"
-        return context
+            parts.append(f"--- Document {i} ---\n"
+                         f"Title: {doc['title']}\n"
+                         f"Type: {doc['document_type']}\n"
+                         f"Content: {doc['content']}\n\n")
+        return "".join(parts)
     
     def _generate_response(self, query: str, context: str) -> str:
         """Generate AI response using GPT-4o-mini"""
         try:
-            prompt = f"""Based on these legal documents, provide concise legal analysis for: {query}
-
-{context}
-
-Structure:
-**Legal Framework:** [Key laws/regulations]
-**Requirements:** [Main obligations]  
-**Compliance:** [Required steps]
-**Recommendations:** [Practical guidance]
-
-**Disclaimer:** General information only. Consult qualified attorney for specific advice."""
-
-            messages = [
-                {"role": "system", "content": "You are a legal analyst. Provide concise, accurate analysis based on provided documents."},
-                {"role": "user", "content": prompt}
-            ]
+            messages = self._messages(query, context)
             
-            if hasattr(self.openai_client, 'chat'):
+            if self._openai_v1:
                 response = self.openai_client.chat.completions.create(
                     model=self.config["model"],
                     messages=messages,
@@ -204,26 +368,63 @@ Structure:
                 return response.choices[0].message.content
                 
         except Exception as e:
-            logger.error(f"OpenAI error: {e}")
+            logger.error("OpenAI error: %s", e)
             return self._fallback_response(query, [])
     
+    def _stream_response(self, query: str, docs: List[Dict]) -> Iterator[str]:
+        """Stream a GPT-4o-mini response (v1 client)"""
+        try:
+            stream = self.openai_client.chat.completions.create(
+                model=self.config["model"],
+                messages=self._messages(query, self._format_context(docs)),
+                temperature=self.config["temperature"],
+                max_tokens=self.config["max_tokens"],
+                stream=True
+            )
+        except Exception as e:
+            logger.error("OpenAI error: %s", e)
+            yield self._fallback_response(query, [])
+            return
+        
+        streamed = False
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    streamed = True
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error("OpenAI stream interrupted: %s", e)
+            # Nothing sent yet: answer from the documents instead; otherwise say it is cut short
+            if streamed:
+                yield _STREAM_INTERRUPTED
+            else:
+                yield from self._fallback_sections(query, docs)
+    
+    def _messages(self, query: str, context: str) -> List[Dict]:
+        """Chat messages for the analysis prompt"""
+        prompt = "".join((_PROMPT_PREFIX, query, "\n\n", context, _PROMPT_SUFFIX))
+        return [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+    
     def _fallback_response(self, query: str, docs: List[Dict]) -> str:
         """Fallback response when AI unavailable"""
+        return "".join(self._fallback_sections(query, docs))
+    
+    def _fallback_sections(self, query: str, docs: List[Dict]) -> Iterator[str]:
+        """Fallback response, section by section"""
         if not docs:
-            return f"No specific legal documents found for '{query}'. Consult a qualified attorney in Saudi Arabia."
+            yield f"No specific legal documents found for '{query}'. Consult a qualified attorney in Saudi Arabia."
+            return
         
         doc_types = set(doc.get('document_type', 'Unknown') for doc in docs)
-        response = f"Based on {len(docs)} legal documents regarding '{query}':\n\n"
-        response += f"**Document Types:** {', '.join(doc_types)}\n\n"
-        response += "**Key Information:**\n"
+        yield f"Based on {len(docs)} legal documents regarding '{query}':\n\n"
+        yield f"**Document Types:** {', '.join(doc_types)}\n\n**Key Information:**\n"
         
-        for i, doc in enumerate(docs[:2], 1):
+        for doc in docs[:2]:
             title = doc.get('title', 'Document')[:40]
             content = doc.get('content', '')[:100]
-            response += f"• {title}: {content}...\n"
+            yield f"• {title}: {content}...\n"
         
-        response += "\n**Legal Disclaimer:** General information only. Consult qualified attorney for specific advice."
-        return response
+        yield _FALLBACK_DISCLAIMER
     
     def _extract_citations(self, docs: List[Dict]) -> List[Dict]:
         """Extract citations from documents"""
@@ -233,7 +434,13 @@ Structure:
                 "relevance_score": doc.get("relevance_score", 0)} for doc in docs]
     
     def _mock_documents(self, query: str, limit: int) -> List[Dict]:
-        """Generate mock documents"""
+        """Search locally processed documents, else generate a mock document"""
+        try:
+            docs = _fallback_index.search(query, limit)
+            if docs:
+                return docs
+        except Exception as e:
+            logger.warning("Fallback index search failed: %s", e)
         return [{
             "content": f"Legal guidance for {query} in Saudi Arabia. Key compliance requirements outlined.",
             "title": f"Legal Guide: {query}",
@@ -244,20 +451,28 @@ Structure:
             "source": "Mock Database (Lightweight)"
         }][:limit]
     
-    def get_legal_categories(self) -> List[str]:
+    def get_legal_categories(self) -> Tuple[str, ...]:
         """Get legal categories"""
-        return ["Corporate Law", "Contract Law", "Employment Law", "Commercial Law", 
-               "Banking Law", "Real Estate Law", "Tax Law", "Regulatory Compliance"]
+        return _LEGAL_CATEGORIES
     
-    def get_available_jurisdictions(self) -> List[str]:
+    def get_available_jurisdictions(self) -> Tuple[str, ...]:
         """Get available jurisdictions"""  
-        return ["Saudi Arabia", "GCC", "International", "UAE", "Qatar", "Kuwait"]
+        return _JURISDICTIONS
     
     def test_connection(self) -> Dict[str, Any]:
-        """Test system connection"""
+        """Test system connection (result cached for _CONNECTION_TEST_TTL seconds)"""
         if not self.weaviate_client:
-            return {"status": "error", "message": "No Weaviate client"}
+            return _NO_CLIENT_TEST
         
+        tested_at, result = self._connection_test
+        now = time.monotonic()
+        if result is None or now - tested_at > _CONNECTION_TEST_TTL:
+            result = self._test_connection()
+            self._connection_test = (now, result)
+        return result
+    
+    def _test_connection(self) -> Dict[str, Any]:
+        """Run the Weaviate readiness and document-count round-trip"""
         try:
             is_ready = self.weaviate_client.is_ready()
             
@@ -282,6 +497,12 @@ Structure:
         except Exception as e:
             return {"status": "error", "message": f"Connection test failed: {str(e)}"}
     
+    def clear_cache(self) -> None:
+        """Drop cached search results and the last connection test"""
+        with self._search_lock:
+            self._search_cache.clear()
+        self._connection_test = (0.0, None)
+    
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status"""
         return {
@@ -15,28 +15,28 @@ This package contains all market analysis and reporting components including:
 __version__ = "1.0.0"
 __author__ = "LinkSaudi"
 
-# Import key components for easier access
-try:
-    from .utils import logger, config_manager, system_state
-except ImportError:
-    pass
-
-try:
-    from .rag_enhanced import generate_rag_response, semantic_search
-except ImportError:
-    pass
-
-try:
-    from .web_search import WebResearchEngine
-except ImportError:
-    pass
-
-try:
-    from .report_generator_enhanced import ReportGenerator
-except ImportError:
-    pass
-
-try:
-    from .market_report_system import MarketReportSystem
-except ImportError:
-    pass
\ No newline at end of file
+# Key components are resolved lazily (PEP 562) so that importing a single
+# submodule such as market_reports.utils does not also load the RAG/ML stack
+_LAZY_EXPORTS = {
+    "logger": ".utils",
+    "config_manager": ".utils",
+    "system_state": ".utils",
+    "generate_rag_response": ".rag_enhanced",
+    "semantic_search": ".rag_enhanced",
+    "WebResearchEngine": ".web_search",
+    "ReportGenerator": ".report_generator_enhanced",
+    "MarketReportSystem": ".market_report_system",
+}
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -2,6 +2,10 @@ import os
 import json
 import time
 import re
+import hashlib
+import sqlite3
+import threading
+import importlib.util
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
@@ -23,12 +27,17 @@ except ImportError:
     print("Warning: openai not installed. Install with: pip install openai")
     OPENAI_AVAILABLE = False
 
+# sentence-transformers pulls in torch; only check that it is installed here
+# and import it when the local fallback model is first needed
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
+    print("Warning: sentence-transformers not installed. Install with: pip install sentence-transformers")
+
 try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
+    from chardet.universaldetector import UniversalDetector
+    CHARDET_AVAILABLE = True
 except ImportError:
-    print("Warning: sentence-transformers not installed. Install with: pip install sentence-transformers")
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    CHARDET_AVAILABLE = False
 
 # Load environment variables safely
 try:
@@ -55,29 +64,118 @@ if OPENAI_AVAILABLE and OPENAI_API_KEY and OPENAI_API_KEY.startswith('sk-'):
         print(f"Error initializing OpenAI client: {e}")
         openai_client = None
 
-# Initialize fallback embedding model
-if SENTENCE_TRANSFORMERS_AVAILABLE:
-    try:
-        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Initialized fallback embedding model: all-MiniLM-L6-v2")
-    except Exception as e:
-        print(f"Error initializing sentence transformer: {e}")
-        embedding_model = None
+# Fallback embedding model, loaded on first use
+_embedding_model_loaded = False
+_embedding_model_lock = threading.Lock()
+
+def get_local_embedding_model():
+    """Load the local fallback embedding model the first time it is needed"""
+    global embedding_model, _embedding_model_loaded
+    if not _embedding_model_loaded:
+        # Concurrent callers wait for the (slow) load instead of seeing None
+        with _embedding_model_lock:
+            if not _embedding_model_loaded:
+                if SENTENCE_TRANSFORMERS_AVAILABLE:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+                        print("Initialized fallback embedding model: all-MiniLM-L6-v2")
+                    except Exception as e:
+                        print(f"Error initializing sentence transformer: {e}")
+                        embedding_model = None
+                _embedding_model_loaded = True
+    return embedding_model
+
+def local_embedding_available() -> bool:
+    """Whether the local fallback model is (or can be) available, without loading it"""
+    return embedding_model is not None if _embedding_model_loaded else SENTENCE_TRANSFORMERS_AVAILABLE
+
+class EmbeddingCache:
+    """Persistent (sha256(text), provider, model) -> vector cache in SQLite"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "hash TEXT, provider TEXT, model TEXT, vec BLOB, "
+                "PRIMARY KEY (hash, provider, model))")
+        return self._conn
+    
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get_many(self, texts: List[str], provider: str, model: str) -> Dict[str, List[float]]:
+        """Cached vectors for the given texts (misses are left out)"""
+        if not texts:
+            return {}
+        by_hash = {self._hash(text): text for text in texts}
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                hashes = list(by_hash)
+                # Stay well under SQLite's bound-parameter limit
+                for i in range(0, len(hashes), 500):
+                    chunk = hashes[i:i + 500]
+                    rows = conn.execute(
+                        "SELECT hash, vec FROM embedding_cache WHERE provider = ? AND model = ? "
+                        f"AND hash IN ({','.join('?' * len(chunk))})",
+                        [provider, model, *chunk]).fetchall()
+                    for text_hash, vec in rows:
+                        found[by_hash[text_hash]] = np.frombuffer(vec, dtype=np.float64).tolist()
+        except sqlite3.Error as e:
+            print(f"Embedding cache read failed: {e}")
+        return found
+    
+    def put_many(self, vectors: Dict[str, List[float]], provider: str, model: str) -> None:
+        """Store freshly computed vectors"""
+        if not vectors:
+            return
+        rows = [(self._hash(text), provider, model, np.asarray(vec, dtype=np.float64).tobytes())
+                for text, vec in vectors.items()]
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Embedding cache write failed: {e}")
+
+# Persistent embedding cache; off unless EMBEDDING_CACHE_PATH names a SQLite file
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None
 
 class EmbeddingEngine:
     """Hybrid embedding engine with OpenAI primary and local fallback"""
     
     def __init__(self):
         self.openai_client = openai_client
-        self.local_model = embedding_model
         self.cache = {}  # Simple in-memory cache
+        self.persistent_cache = embedding_cache
         self.use_openai = openai_client is not None
         self.embedding_model = "text-embedding-3-small"  # Default OpenAI model
         self.dimensions = 1536  # Default dimensions
         
         print(f"Embedding engine initialized:")
         print(f"  - OpenAI available: {self.use_openai}")
-        print(f"  - Local fallback available: {self.local_model is not None}")
+        print(f"  - Local fallback available: {local_embedding_available()}")
+    
+    @property
+    def local_model(self):
+        """Local fallback model (loaded on first access)"""
+        return get_local_embedding_model()
+    
+    def _cache_model(self, dimensions: int = None) -> str:
+        """Persistent cache key for the current model at the requested size"""
+        return f"{self.embedding_model}@{dimensions or 'native'}"
     
     def set_openai_model(self, model_name: str, dimensions: int = None):
         """Set the OpenAI embedding model to use"""
@@ -97,6 +195,15 @@ class EmbeddingEngine:
         
         # Try OpenAI first
         if self.use_openai:
+            # encode() requests the model's native size (no dimensions argument)
+            persistent = self.persistent_cache if use_cache else None
+            cache_model = self._cache_model()
+            if persistent:
+                stored = persistent.get_many([text], "openai", cache_model)
+                if text in stored:
+                    self.cache[text] = stored[text]
+                    return stored[text]
+            
             try:
                 # FIXED: Remove dimensions parameter for older OpenAI models
                 if self.embedding_model == "text-embedding-3-small":
@@ -118,6 +225,8 @@ class EmbeddingEngine:
                 # Cache the result
                 if use_cache:
                     self.cache[text] = embedding
+                if persistent:
+                    persistent.put_many({text: embedding}, "openai", cache_model)
                 
                 return embedding
                 
@@ -147,51 +256,41 @@ class EmbeddingEngine:
         if not texts:
             return []
             
-        embeddings = []
-        
         # Process in batches for OpenAI
         if self.use_openai:
             try:
-                for i in range(0, len(texts), batch_size):
-                    batch = texts[i:i + batch_size]
-                    
-                    # Filter out empty texts
-                    filtered_batch = [text for text in batch if text and text.strip()]
-                    if not filtered_batch:
-                        continue
-                    
-                    # Check cache first
-                    batch_embeddings = []
-                    uncached_texts = []
-                    uncached_indices = []
-                    
-                    for j, text in enumerate(filtered_batch):
-                        if text in self.cache:
-                            batch_embeddings.append(self.cache[text])
-                        else:
-                            batch_embeddings.append(None)
-                            uncached_texts.append(text)
-                            uncached_indices.append(j)
-                    
-                    # Get embeddings for uncached texts
-                    if uncached_texts:
-                        response = self.openai_client.embeddings.create(
-                            model=self.embedding_model,
-                            input=uncached_texts,
-                            dimensions=self.dimensions
-                        )
-                        
-                        # Fill in the uncached embeddings
-                        for idx, embedding_data in enumerate(response.data):
-                            original_idx = uncached_indices[idx]
-                            embedding = embedding_data.embedding
-                            batch_embeddings[original_idx] = embedding
-                            # Cache the result
-                            self.cache[uncached_texts[idx]] = embedding
+                # Filter out empty texts
+                filtered_texts = [text for text in texts if text and text.strip()]
+                
+                # Only request texts that are not cached yet, each once, packed
+                # into full batches regardless of where the cache hits fall
+                uncached_texts = list(dict.fromkeys(
+                    text for text in filtered_texts if text not in self.cache))
+                
+                # encode_batch() requests self.dimensions, so key the model with it
+                persistent = self.persistent_cache
+                cache_model = self._cache_model(self.dimensions)
+                if persistent and uncached_texts:
+                    stored = persistent.get_many(uncached_texts, "openai", cache_model)
+                    self.cache.update(stored)
+                    uncached_texts = [text for text in uncached_texts if text not in stored]
+                
+                for i in range(0, len(uncached_texts), batch_size):
+                    batch = uncached_texts[i:i + batch_size]
+                    response = self.openai_client.embeddings.create(
+                        model=self.embedding_model,
+                        input=batch,
+                        dimensions=self.dimensions
+                    )
                     
-                    embeddings.extend(batch_embeddings)
+                    # Cache the results
+                    fresh = {text: embedding_data.embedding
+                             for text, embedding_data in zip(batch, response.data)}
+                    self.cache.update(fresh)
+                    if persistent:
+                        persistent.put_many(fresh, "openai", cache_model)
                 
-                return embeddings
+                return [self.cache[text] for text in filtered_texts]
                 
             except Exception as e:
                 print(f"OpenAI batch embedding failed: {e}")
@@ -218,14 +317,29 @@ class EmbeddingEngine:
 # Initialize the global embedding engine
 embedding_engine = EmbeddingEngine()
 
+# Connected client, shared by every caller in the process
+_weaviate_client = None
+_weaviate_client_lock = threading.Lock()
+
 def get_weaviate_client():
-    """Connect to Weaviate with enhanced error handling"""
+    """Get the shared Weaviate client, connecting on first use"""
+    global _weaviate_client
+    if _weaviate_client is not None:
+        return _weaviate_client
+    
     if not WEAVIATE_AVAILABLE:
         raise ImportError("Weaviate client not available. Please install with: pip install weaviate-client")
     
     if not WEAVIATE_URL or not WEAVIATE_API_KEY:
         raise ValueError("Weaviate URL and API key must be set in .env file")
     
+    with _weaviate_client_lock:
+        if _weaviate_client is None:
+            _weaviate_client = _connect_weaviate()
+    return _weaviate_client
+
+def _connect_weaviate():
+    """Connect to Weaviate with enhanced error handling"""
     # Implement retry logic with exponential backoff
     max_retries = 3
     retry_delay = 2  # seconds
@@ -541,7 +655,7 @@ def get_embedding_info():
     """Get information about the current embedding configuration"""
     return {
         "openai_available": embedding_engine.use_openai,
-        "local_fallback_available": embedding_engine.local_model is not None,
+        "local_fallback_available": local_embedding_available(),
         "current_model": embedding_engine.embedding_model if embedding_engine.use_openai else "Local fallback",
         "dimensions": embedding_engine.dimensions if embedding_engine.use_openai else "384 (local)",
         "cache_size": len(embedding_engine.cache)
@@ -550,23 +664,22 @@ def get_embedding_info():
 # File handling functions
 def detect_file_encoding(filename: str) -> str:
     """Detect the encoding of a file"""
-    try:
-        from chardet.universaldetector import UniversalDetector
-        detector = UniversalDetector()
-        try:
-            with open(filename, 'rb') as f:
-                for line in f:
-                    detector.feed(line)
-                    if detector.done:
-                        break
-                detector.close()
-            
-            return detector.result['encoding'] or 'utf-8'
-        except Exception as e:
-            print(f"Error detecting encoding: {e}")
-            return 'utf-8'  # Default to UTF-8 on error
-    except ImportError:
+    if not CHARDET_AVAILABLE:
         return 'utf-8'
+    
+    detector = UniversalDetector()
+    try:
+        with open(filename, 'rb') as f:
+            for line in f:
+                detector.feed(line)
+                if detector.done:
+                    break
+            detector.close()
+        
+        return detector.result['encoding'] or 'utf-8'
+    except Exception as e:
+        print(f"Error detecting encoding: {e}")
+        return 'utf-8'  # Default to UTF-8 on error
 
 def read_file_with_encoding(filename: str) -> Optional[str]:
     """Read a file with automatic encoding detection"""
@@ -6,7 +6,6 @@ from typing import Dict, List, Any, Optional, Tuple, Callable
 from datetime import datetime
 import logging
 from functools import wraps
-import traceback
 
 # Configure logging
 logging.basicConfig(
@@ -19,51 +18,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger("market_intelligence")
 
+# Optional encoding detection, probed once at import
+try:
+    from chardet.universaldetector import UniversalDetector
+    CHARDET_AVAILABLE = True
+except ImportError:
+    CHARDET_AVAILABLE = False
+
 # -----------------------------
 # File & Encoding Utilities
 # -----------------------------
 
 def detect_file_encoding(filename: str) -> str:
     """Detect the encoding of a file with robust error handling"""
-    try:
-        from chardet.universaldetector import UniversalDetector
-        detector = UniversalDetector()
-        
-        try:
-            with open(filename, 'rb') as f:
-                for line in f:
-                    detector.feed(line)
-                    if detector.done:
-                        break
-                detector.close()
-            
-            return detector.result['encoding'] or 'utf-8'
-        except Exception as e:
-            logger.warning(f"Error detecting encoding for {filename}: {e}")
-            return 'utf-8'  # Default to UTF-8 on error
-    except ImportError:
+    if not CHARDET_AVAILABLE:
         logger.warning("chardet not installed. Defaulting to utf-8.")
         return 'utf-8'
+    
+    detector = UniversalDetector()
+    try:
+        with open(filename, 'rb') as f:
+            for line in f:
+                detector.feed(line)
+                if detector.done:
+                    break
+            detector.close()
+        
+        return detector.result['encoding'] or 'utf-8'
+    except Exception as e:
+        logger.warning(f"Error detecting encoding for {filename}: {e}")
+        return 'utf-8'  # Default to UTF-8 on error
 
 def read_file_with_encoding(filename: str) -> Optional[str]:
     """Read a file with automatic encoding detection and fallbacks"""
     try:
         # Try to detect encoding
         encoding = detect_file_encoding(filename)
-        logger.debug(f"Detected encoding {encoding} for file {filename}")
+        logger.debug("Detected encoding %s for file %s", encoding, filename)
         
         # Try to read with detected encoding
         try:
             with open(filename, 'r', encoding=encoding) as f:
                 return f.read()
         except UnicodeDecodeError:
-            logger.debug(f"Failed to decode with {encoding}, trying utf-8")
+            logger.debug("Failed to decode with %s, trying utf-8", encoding)
             # If that fails, try UTF-8
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
                     return f.read()
             except UnicodeDecodeError:
-                logger.debug(f"Failed to decode with utf-8, using latin-1")
+                logger.debug("Failed to decode with utf-8, using latin-1")
                 # If UTF-8 fails, fall back to latin-1 which should always work
                 with open(filename, 'r', encoding='latin-1') as f:
                     return f.read()
@@ -81,7 +85,7 @@ def write_file_with_encoding(filename: str, content: str) -> bool:
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        logger.debug(f"Successfully wrote to file {filename}")
+        logger.debug("Successfully wrote to file %s", filename)
         return True
     except Exception as e:
         logger.error(f"Error writing file {filename}: {e}")
@@ -109,7 +113,7 @@ def save_json_with_encoding(filename: str, data: Any, indent: int = 2) -> bool:
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=indent)
         
-        logger.debug(f"Successfully saved JSON to {filename}")
+        logger.debug("Successfully saved JSON to %s", filename)
         return True
     except Exception as e:
         logger.error(f"Error saving JSON file {filename}: {e}")
@@ -242,7 +246,7 @@ def safe_execute(func: Callable, *args, default_return=None, error_message="Func
         return func(*args, **kwargs)
     except Exception as e:
         logger.error(f"{error_message}: {e}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback for failed call", exc_info=True)
         return default_return
 
 # -----------------------------
@@ -310,18 +314,18 @@ def log_function_call(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         func_name = func.__name__
-        logger.debug(f"Calling {func_name}")
+        logger.debug("Calling %s", func_name)
         start_time = time.time()
         
         try:
             result = func(*args, **kwargs)
             elapsed_time = time.time() - start_time
-            logger.debug(f"{func_name} completed in {elapsed_time:.2f}s")
+            logger.debug("%s completed in %.2fs", func_name, elapsed_time)
             return result
         except Exception as e:
             elapsed_time = time.time() - start_time
             logger.error(f"{func_name} failed after {elapsed_time:.2f}s: {e}")
-            logger.debug(traceback.format_exc())
+            logger.debug("Traceback for %s", func_name, exc_info=True)
             raise
     
     return wrapper
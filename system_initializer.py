@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 # system_initializer.py - Lightweight system initialization
 
-import os
+import sys
+import time
+import types
 import logging
-from typing import Dict, Any, Callable
-from dependency_container import container
+import threading
+import importlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, Callable, Optional
+from dependency_container import container, MockService
 
 try:
     from market_reports.utils import logger, system_state
@@ -26,195 +31,490 @@ except ImportError:
     
     system_state = SystemState()
 
-try:
-    from legal_compliance import LegalRAGEngine, LegalChatbot
-    LEGAL_AVAILABLE = True
-except ImportError:
-    LEGAL_AVAILABLE = False
-    logger.warning("Legal compliance not available")
+# Legal compliance is probed, not imported: the package is only loaded when
+# a legal component is actually created
+_LEGAL_SPEC = None
+
+def _load_legal_compliance() -> bool:
+    """Check (once) whether legal_compliance is importable without executing it"""
+    global _LEGAL_SPEC
+    if _LEGAL_SPEC is None:
+        from importlib.util import find_spec
+        _LEGAL_SPEC = find_spec("legal_compliance") or False
+    return bool(_LEGAL_SPEC)
+
+LEGAL_AVAILABLE = _load_legal_compliance()
+
+# Startup messages are logged on first initialization, not at import time
+_bootstrap_done = False
+
+def _bootstrap() -> None:
+    """Log the import-time availability checks once"""
+    global _bootstrap_done
+    _bootstrap_done = True
+    if not LEGAL_AVAILABLE:
+        logger.warning("Legal compliance not available")
+
+def _lazy_module(modname: str) -> types.ModuleType:
+    """Import a module on first use; later calls are a sys.modules lookup"""
+    return sys.modules.get(modname) or importlib.import_module(modname)
+
+def _lazy(modname: str, attr: str) -> Any:
+    """Resolve modname.attr, importing the module only when first needed"""
+    return getattr(_lazy_module(modname), attr)
+
+def _safe_build(label: str, fallback: Any, build: Callable[[], Any]) -> Any:
+    """Run a component build, logging the failure and returning fallback if it raises"""
+    try:
+        return build()
+    except Exception as e:
+        logger.error("%s creation failed: %s", label, e)
+        return fallback
+
+def __getattr__(name: str):
+    """Keep system_initializer.LegalRAGEngine / LegalChatbot working for legacy callers"""
+    if name in ("LegalRAGEngine", "LegalChatbot"):
+        return _lazy("legal_compliance", name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Component names are used as keys in the factory map, the container and
+# system_state; interning them keeps those lookups on the identity fast path
+_REQUIRED_COMPONENTS = tuple(sys.intern(name) for name in (
+    "rag_engine", "web_search", "report_generator",
+    "market_report_system", "legal_rag_engine", "legal_chatbot"
+))
+
+# Fallback components used when a real component cannot be created. They are
+# stateless stubs, so a single shared instance of each is enough
+
+class MockRAGEngine(MockService):
+    __slots__ = ('client', 'openai_client', 'embedding_engine')
+    
+    def __init__(self):
+        self.client = None
+        self.openai_client = None
+        self.embedding_engine = None
+    def generate_rag_response(self, query, context_limit=5):
+        return f"Mock response for: {query}"
+    def get_legal_deps(self):
+        return self.client, self.openai_client, self.embedding_engine
+
+class MockWebSearch(MockService):
+    __slots__ = ()
+    
+    def research_topic(self, query, **kwargs):
+        return {"data": [{"title": f"Mock result for {query}", "url": "mock://url"}]}
+
+class MockReportGenerator(MockService):
+    __slots__ = ()
+    
+    def generate_market_report(self, title, sectors, geography, **kwargs):
+        return {"title": title, "sections": [{"title": "Mock Section", "content": "Mock content"}]}
+
+class MockMarketReportSystem(MockService):
+    __slots__ = ()
+    
+    def create_market_report(self, **kwargs):
+        return {"report_data": {"title": "Mock Report"}}
+    def list_reports(self):
+        return []
+
+_MOCK_RAG_ENGINE = MockRAGEngine()
+_MOCK_WEB_SEARCH = MockWebSearch()
+_MOCK_REPORT_GENERATOR = MockReportGenerator()
+_MOCK_MARKET_REPORT_SYSTEM = MockMarketReportSystem()
+
+class LightweightRAGEngine:
+    """Thin wrapper over market_reports.rag_enhanced"""
+    
+    def __init__(self, rag_enhanced):
+        self._rag_enhanced = rag_enhanced
+        self.client = rag_enhanced.get_weaviate_client()
+        # Resolved once here so dependent (legal) components can
+        # reuse them without re-probing rag_enhanced
+        self.openai_client = rag_enhanced.openai_client
+        self.embedding_engine = rag_enhanced.embedding_engine
+    
+    def generate_rag_response(self, query, context_limit=5):
+        try:
+            return self._rag_enhanced.generate_rag_response(query, context_limit)
+        except Exception as e:
+            return f"RAG response unavailable: {str(e)}"
+    
+    def get_legal_deps(self):
+        """Weaviate client, OpenAI client and embedding engine"""
+        return self.client, self.openai_client, self.embedding_engine
+
+# Legal status is re-probed at most once per TTL window
+_LEGAL_DIAGNOSTICS_TTL = 5
+
+_NO_SKIP = frozenset()
+
+# Runs the legal status probe (a Weaviate round-trip); created on first probe
+_probe_executor = None
+_probe_executor_lock = threading.Lock()
+
+# Seconds probe_legal_system waits for a status probe before reporting a timeout
+_LEGAL_PROBE_TIMEOUT = 10
+
+def _get_probe_executor() -> ThreadPoolExecutor:
+    """Single-worker executor for legal status probes"""
+    global _probe_executor
+    if _probe_executor is None:
+        with _probe_executor_lock:
+            if _probe_executor is None:
+                _probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="legal-probe")
+    return _probe_executor
 
 class SystemInitializer:
     """Lightweight system initializer"""
     
+    # Components not initialized in offline mode
+    _OFFLINE_SKIP = frozenset({sys.intern('web_search')})
+    
     def __init__(self):
-        self.required_components = [
-            "rag_engine", "web_search", "report_generator", 
-            "market_report_system", "legal_rag_engine", "legal_chatbot"
-        ]
+        self.required_components = _REQUIRED_COMPONENTS
         self.initialized = False
+        self._factories = {}
+        self._factory_items = None
+        self._deps = {}
+        self._offline_mocks = {}
+        self._instances = {}
+        self._registered = None  # (factory items, offline_mode) last given to the container
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._legal_probe = None
+        self._register_core_components()
+        self.freeze()
+    
+    def _register_core_components(self):
+        """Register the built-in component factories and their dependencies"""
+        factories = {
+            'rag_engine': self._create_rag_engine,
+            'web_search': self._create_web_search,
+            'report_generator': self._create_report_generator,
+            'market_report_system': self._create_market_report_system,
+        }
+        deps = {
+            'report_generator': ('rag_engine', 'web_search'),
+            'market_report_system': ('rag_engine', 'web_search', 'report_generator'),
+        }
+        
+        if LEGAL_AVAILABLE:
+            factories['legal_rag_engine'] = self._create_legal_rag_engine
+            factories['legal_chatbot'] = self._create_legal_chatbot
+            deps['legal_rag_engine'] = ('rag_engine',)
+            deps['legal_chatbot'] = ('legal_rag_engine',)
+        
+        # Network-bound components are replaced by their mocks in offline mode
+        offline_mocks = {
+            'rag_engine': self._create_mock_rag_engine,
+            'web_search': self._create_mock_web_search,
+        }
+        
+        self.register_component_factories(factories, deps, offline_mocks)
+    
+    def register_component_factory(self, name: str, factory: Callable, deps: tuple = ()) -> None:
+        """Register (or replace) a component factory; the map is re-frozen on next init
+
+        Factories declared with deps receive them as keyword arguments.
+        """
+        self.register_component_factories({name: factory}, {name: deps})
+    
+    def register_component_factories(self, factories: Dict[str, Callable],
+                                     deps: Optional[Dict[str, tuple]] = None,
+                                     offline_mocks: Optional[Dict[str, Callable]] = None) -> None:
+        """Register several component factories with a single copy of the map
+
+        offline_mocks maps network-bound components to the factory used
+        instead of theirs when initializing in offline mode.
+        """
+        deps = deps or {}
+        offline_mocks = offline_mocks or {}
+        # Re-registering an identical setup must not unfreeze the map;
+        # bound methods compare equal (not identical) across lookups
+        changed = {name: factory for name, factory in factories.items()
+                   if name not in self._factories
+                   or self._factories[name] != factory
+                   or self._deps.get(name, ()) != tuple(deps.get(name, ()))
+                   or self._offline_mocks.get(name) != offline_mocks.get(name)}
+        if not changed:
+            return
+        
+        merged = dict(self._factories)
+        merged.update(changed)
+        self._factories = merged
+        self._factory_items = None
+        for name in changed:
+            self._deps[name] = tuple(deps.get(name, ()))
+            if name in offline_mocks:
+                self._offline_mocks[name] = offline_mocks[name]
+            else:
+                self._offline_mocks.pop(name, None)
+    
+    def freeze(self) -> None:
+        """Freeze the factory map once registration is complete"""
+        self._factories = types.MappingProxyType(dict(self._factories))
+        self._factory_items = tuple(self._factories.items())
+    
+    def _register_factories(self, offline_mode: bool = False) -> None:
+        """Register factories with the container as singletons"""
+        # Singletons let dependent factories reuse the instance built here
+        # instead of re-running the factory
+        if self._factory_items is None:
+            self.freeze()
+        registered = self._registered
+        if registered is not None and registered[0] is self._factory_items and registered[1] == offline_mode:
+            # Same setup is already in the container; keep the built instances
+            return
+        
+        deps = self._deps
+        offline_mocks = self._offline_mocks if offline_mode else {}
+        for name, factory in self._factory_items:
+            if name in offline_mocks:
+                factory = offline_mocks[name]
+            elif deps.get(name):
+                factory = self._inject_deps(factory, deps[name])
+            container.register_singleton_factory(name, factory)
+        self._instances = {}
+        self._registered = (self._factory_items, offline_mode)
+    
+    def _inject_deps(self, factory: Callable, deps: tuple) -> Callable:
+        """Wrap a factory so its dependencies are resolved once and passed in"""
+        def create(container):
+            instances = self._instances
+            resolved = {dep: instances[dep] if dep in instances else container.get(dep)
+                        for dep in deps}
+            return factory(container, **resolved)
+        return create
     
     def initialize_system(self, offline_mode: bool = False) -> bool:
         """Initialize all components"""
         if self.initialized:
             return True
         
-        logger.info(f"Initializing system (offline={offline_mode})")
-        
-        try:
-            # Register factories
-            container.register_factory('rag_engine', self._create_rag_engine)
-            container.register_factory('web_search', self._create_web_search)
-            container.register_factory('report_generator', self._create_report_generator)
-            container.register_factory('market_report_system', self._create_market_report_system)
+        # Concurrent callers wait here; only the first one runs the factories
+        with self._init_lock:
+            if self.initialized:
+                return True
             
-            if LEGAL_AVAILABLE:
-                container.register_factory('legal_rag_engine', self._create_legal_rag_engine)
-                container.register_factory('legal_chatbot', self._create_legal_chatbot)
+            if not _bootstrap_done:
+                _bootstrap()
             
-            # Initialize core components
-            for component in self.required_components:
-                if offline_mode and component == 'web_search':
-                    continue
-                self._initialize_component(component)
+            logger.info("Initializing system (offline=%s)", offline_mode)
+        
+            try:
+                self._register_factories(offline_mode)
             
-            self._update_system_state()
-            self.initialized = True
-            logger.info("System initialization complete")
-            return True
+                # Initialize components level by level; components within a level
+                # do not depend on each other, so their (I/O-bound) factories run
+                # concurrently
+                skip = self._OFFLINE_SKIP if offline_mode else _NO_SKIP
+                for level in self._dependency_levels(self.required_components, skip):
+                    self._resolve_level(level, skip)
             
-        except Exception as e:
-            logger.error(f"System initialization failed: {e}")
-            system_state.current_state = 'offline'
-            return False
+                self._update_system_state()
+                self.initialized = True
+                logger.info("System initialization complete")
+                return True
+            
+            except Exception as e:
+                logger.error("System initialization failed: %s", e)
+                system_state.current_state = 'offline'
+                return False
+    
+    def initialize_subset(self, names, offline_mode: bool = False) -> Dict[str, Any]:
+        """Initialize only the named components (and what they depend on)"""
+        if not self.initialized:
+            self._register_factories(offline_mode)
+        
+        skip = self._OFFLINE_SKIP if offline_mode else _NO_SKIP
+        components = {name: self._resolve(name, skip) for name in names}
+        self._update_system_state()
+        return components
+    
+    def probe_legal_system(self) -> Optional[Dict[str, Any]]:
+        """Legal chatbot status, re-probed at most once per TTL window"""
+        # Resolve through the container (a singleton dict hit) rather than
+        # self._instances, so a chatbot rebuilt by restart_legal_system is seen
+        legal_chatbot = container.get('legal_chatbot')
+        if legal_chatbot is None:
+            return None
+        
+        # get_system_status() runs a Weaviate connection test (itself TTL-cached
+        # by the legal RAG engine); reuse the result for the same chatbot within
+        # the diagnostics TTL so a transient outage or stale session counters
+        # do not stick. A probe still in flight is waited on, not restarted
+        probe = self._legal_probe
+        if (probe is None or probe[0] is not legal_chatbot
+                or (probe[2].done() and time.monotonic() - probe[1] > _LEGAL_DIAGNOSTICS_TTL)):
+            if not hasattr(legal_chatbot, 'get_system_status'):
+                return None
+            probe = self._legal_probe = (legal_chatbot, time.monotonic(),
+                                         _get_probe_executor().submit(legal_chatbot.get_system_status))
+        
+        try:
+            return probe[2].result(timeout=_LEGAL_PROBE_TIMEOUT)
+        except FuturesTimeoutError:
+            logger.warning("Legal status probe timed out after %ss", _LEGAL_PROBE_TIMEOUT)
+            return {"legal_rag_engine": "available",
+                    "rag_connection_test": {"status": "timeout",
+                                            "message": "Legal status probe timed out"}}
     
-    def _initialize_component(self, name: str) -> bool:
+    def _dependency_levels(self, names, skip=_NO_SKIP):
+        """Group components (and their dependencies) into dependency levels"""
+        levels = {}
+        
+        def level_of(name):
+            if name not in levels:
+                deps = [dep for dep in self._deps.get(name, ()) if dep not in skip]
+                levels[name] = 1 + max((level_of(dep) for dep in deps), default=-1)
+            return levels[name]
+        
+        for name in names:
+            if name not in skip:
+                level_of(name)
+        
+        grouped = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for name, level in levels.items():
+            grouped[level].append(name)
+        return grouped
+    
+    def _resolve_level(self, names, skip=_NO_SKIP) -> None:
+        """Resolve a group of mutually independent components"""
+        if len(names) == 1:
+            self._resolve(names[0], skip)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(names))) as pool:
+            futures = {name: pool.submit(self._resolve, name, skip) for name in names}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("Component %s failed: %s", name, e)
+    
+    def _resolve(self, name: str, skip=_NO_SKIP) -> Any:
+        """Initialize a component after its declared dependencies (memoized)"""
+        if name in self._instances:
+            return self._instances[name]
+        if name in skip:
+            return None
+        
+        for dep in self._deps.get(name, ()):
+            self._resolve(dep, skip)
+        
+        component = self._initialize_component(name)
+        with self._lock:
+            self._instances[name] = component
+        return component
+    
+    def _initialize_component(self, name: str) -> Any:
         """Initialize single component"""
         try:
             component = container.get(name)
-            system_state.set_component_status(name, bool(component), 
-                                            f"Component {'available' if component else 'failed'}")
-            return bool(component)
+            self._set_status(name, bool(component), 
+                             f"Component {'available' if component else 'failed'}")
+            return component
         except Exception as e:
-            logger.error(f"Component {name} failed: {e}")
-            system_state.set_component_status(name, False, f"Error: {str(e)}")
-            return False
+            logger.error("Component %s failed: %s", name, e)
+            self._set_status(name, False, f"Error: {str(e)}")
+            return None
+    
+    def _set_status(self, name: str, available: bool, description: str) -> None:
+        """Record component status (system_state is not thread-safe)"""
+        with self._lock:
+            system_state.set_component_status(name, available, description)
+    
+    def _component_statuses(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot the status of every required component in one pass"""
+        get_status = system_state.get_component_status
+        return {comp: get_status(comp) for comp in self.required_components}
     
     def _update_system_state(self):
         """Update overall system state"""
-        available = sum(1 for comp in self.required_components 
-                       if system_state.get_component_status(comp).get('available', False))
-        total = len(self.required_components)
+        statuses = self._component_statuses()
+        available = sum(1 for status in statuses.values() if status.get('available', False))
+        total = len(statuses)
         
         if available >= total * 0.8:
-            system_state.current_state = 'online'
+            state = 'online'
         elif available > 0:
-            system_state.current_state = 'degraded'
+            state = 'degraded'
         else:
-            system_state.current_state = 'offline'
+            state = 'offline'
+        system_state.current_state = state
         
-        logger.info(f"System state: {system_state.current_state} ({available}/{total} components)")
+        logger.info("System state: %s (%d/%d components)", state, available, total)
     
     def get_system_overview(self) -> Dict[str, Any]:
         """Get system overview"""
+        statuses = self._component_statuses()
         return {
             'system_state': system_state.current_state,
             'initialized': self.initialized,
-            'total_components': len(self.required_components),
-            'available_components': sum(1 for comp in self.required_components 
-                                      if system_state.get_component_status(comp).get('available', False))
+            'total_components': len(statuses),
+            'available_components': sum(1 for status in statuses.values() 
+                                      if status.get('available', False)),
+            'component_status': statuses
         }
     
     # Component Factories (Lightweight)
     
     def _create_rag_engine(self, container):
         """Create RAG engine"""
-        try:
-            from market_reports.rag_enhanced import get_weaviate_client, generate_rag_response
-            
-            class LightweightRAGEngine:
-                def __init__(self):
-                    self.client = get_weaviate_client()
-                
-                def generate_rag_response(self, query, context_limit=5):
-                    try:
-                        return generate_rag_response(query, context_limit)
-                    except Exception as e:
-                        return f"RAG response unavailable: {str(e)}"
-            
-            return LightweightRAGEngine()
-        except Exception as e:
-            logger.error(f"RAG engine creation failed: {e}")
-            return self._create_mock_rag_engine()
+        return _safe_build("RAG engine", _MOCK_RAG_ENGINE,
+                           lambda: LightweightRAGEngine(_lazy_module("market_reports.rag_enhanced")))
     
     def _create_web_search(self, container):
         """Create web search engine"""
-        try:
-            from market_reports.web_search import WebResearchEngine
-            return WebResearchEngine()
-        except Exception as e:
-            logger.error(f"Web search creation failed: {e}")
-            
-            class MockWebSearch:
-                def research_topic(self, query, **kwargs):
-                    return {"data": [{"title": f"Mock result for {query}", "url": "mock://url"}]}
-            return MockWebSearch()
+        return _safe_build("Web search", _MOCK_WEB_SEARCH,
+                           lambda: _lazy("market_reports.web_search", "WebResearchEngine")())
     
-    def _create_report_generator(self, container):
+    def _create_report_generator(self, container, *, rag_engine=None, web_search=None):
         """Create report generator"""
-        try:
-            from market_reports.report_generator_enhanced import ReportGenerator
-            return ReportGenerator(rag_engine=container.get('rag_engine'), 
-                                 web_search=container.get('web_search'))
-        except Exception as e:
-            logger.error(f"Report generator creation failed: {e}")
-            
-            class MockReportGenerator:
-                def generate_market_report(self, title, sectors, geography, **kwargs):
-                    return {"title": title, "sections": [{"title": "Mock Section", "content": "Mock content"}]}
-            return MockReportGenerator()
+        return _safe_build("Report generator", _MOCK_REPORT_GENERATOR,
+                           lambda: _lazy("market_reports.report_generator_enhanced", "ReportGenerator")(
+                               rag_engine=rag_engine, web_search=web_search))
     
-    def _create_market_report_system(self, container):
+    def _create_market_report_system(self, container, *, rag_engine=None, web_search=None,
+                                     report_generator=None):
         """Create market report system"""
-        try:
-            from market_reports.market_report_system import MarketReportSystem
-            return MarketReportSystem(
-                rag_engine=container.get('rag_engine'),
-                web_search=container.get('web_search'),
-                report_generator=container.get('report_generator')
-            )
-        except Exception as e:
-            logger.error(f"Market report system creation failed: {e}")
-            
-            class MockMarketReportSystem:
-                def create_market_report(self, **kwargs):
-                    return {"report_data": {"title": "Mock Report"}}
-                def list_reports(self):
-                    return []
-            return MockMarketReportSystem()
-    
-    def _create_legal_rag_engine(self, container):
+        return _safe_build("Market report system", _MOCK_MARKET_REPORT_SYSTEM,
+                           lambda: _lazy("market_reports.market_report_system", "MarketReportSystem")(
+                               rag_engine=rag_engine,
+                               web_search=web_search,
+                               report_generator=report_generator
+                           ))
+    
+    def _create_legal_rag_engine(self, container, *, rag_engine=None):
         """Create legal RAG engine"""
         if not LEGAL_AVAILABLE:
             return None
         
-        try:
-            rag_engine = container.get('rag_engine')
-            weaviate_client = getattr(rag_engine, 'client', None) if rag_engine else None
-            return LegalRAGEngine(weaviate_client=weaviate_client)
-        except Exception as e:
-            logger.error(f"Legal RAG creation failed: {e}")
-            return None
+        def build():
+            LegalRAGEngine = _lazy("legal_compliance", "LegalRAGEngine")
+            weaviate_client, openai_client, _ = (
+                rag_engine.get_legal_deps() if rag_engine else (None, None, None))
+            return LegalRAGEngine(weaviate_client=weaviate_client, openai_client=openai_client)
+        
+        return _safe_build("Legal RAG", None, build)
     
-    def _create_legal_chatbot(self, container):
+    def _create_legal_chatbot(self, container, *, legal_rag_engine=None):
         """Create legal chatbot"""
         if not LEGAL_AVAILABLE:
             return None
         
-        try:
-            legal_rag = container.get('legal_rag_engine')
-            return LegalChatbot(legal_rag_engine=legal_rag)
-        except Exception as e:
-            logger.error(f"Legal chatbot creation failed: {e}")
-            return None
+        return _safe_build("Legal chatbot", None,
+                           lambda: _lazy("legal_compliance", "LegalChatbot")(legal_rag_engine=legal_rag_engine))
     
-    def _create_mock_rag_engine(self):
+    def _create_mock_rag_engine(self, container):
         """Mock RAG engine fallback"""
-        class MockRAGEngine:
-            def __init__(self):
-                self.client = None
-            def generate_rag_response(self, query, context_limit=5):
-                return f"Mock response for: {query}"
-        return MockRAGEngine()
+        return _MOCK_RAG_ENGINE
+    
+    def _create_mock_web_search(self, container):
+        """Mock web search fallback"""
+        return _MOCK_WEB_SEARCH
 
 # Global initializer
 system_initializer = SystemInitializer()
@@ -223,6 +523,14 @@ def initialize_system(offline_mode=False):
     """Initialize system"""
     return system_initializer.initialize_system(offline_mode)
 
+def initialize_subset(names, offline_mode=False):
+    """Initialize only the named components"""
+    return system_initializer.initialize_subset(names, offline_mode)
+
+def probe_legal_system():
+    """Get the (cached) legal system status"""
+    return system_initializer.probe_legal_system()
+
 def get_system_overview():
     """Get system overview"""
     return system_initializer.get_system_overview()
\ No newline at end of file